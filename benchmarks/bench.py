@@ -0,0 +1,292 @@
+"""GHOST HUB 생성 파이프라인 오프라인 벤치마크
+
+Gemini / DuckDuckGo / Unsplash를 로컬 가짜 백엔드로 바꿔 엔진의 build_* 파이프라인과
+후처리 단계(JSON 파싱, 검수/자동 교정, 태그 정리, 소제목 치환, 최종 HTML 조립)를 원고 크기별로 측정.
+단계별 소요 시간(중앙값)과 메모리 할당 최대치(tracemalloc)를 출력하고,
+기준선(JSON)과 비교해 느려진 항목을 표시.
+
+    python benchmarks/bench.py                      # 측정 + 기준선(benchmarks/baseline.json)과 비교
+    python benchmarks/bench.py --save               # 측정 결과를 기준선으로 저장
+    python benchmarks/bench.py --output run.json    # 측정 결과를 따로 저장 (기준선은 그대로)
+    python benchmarks/bench.py --compare run.json   # 측정 없이 저장된 결과를 기준선과 비교
+    python benchmarks/bench.py --llm-latency 0.5 --modes naver_info --sizes 250KB
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import shutil
+import random
+import argparse
+import platform
+import subprocess
+import tempfile
+import statistics
+import tracemalloc
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 생성 결과 저장은 임시 DB로 (import 전에 설정)
+_workdir = tempfile.mkdtemp(prefix="ghost-bench-")
+atexit.register(shutil.rmtree, _workdir, ignore_errors=True)
+os.environ["GHOST_DB_PATH"] = os.path.join(_workdir, "bench.db")
+
+import ghost_engine  # noqa: E402
+from fakes import SIZES, canned_article, install, reset_caches  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+KEYWORD = "겨울철 전기요금 절약"
+PRODUCT = "다이슨 V15"
+PRODUCT_URL = "https://link.coupang.com/a/bench"
+BANNER = '<ins class="adsbygoogle" data-ad-slot="bench"></ins>'
+
+PIPELINES = {
+    'naver_profit': lambda stream: ghost_engine.build_naver_profit(KEYWORD, PRODUCT, PRODUCT_URL, stream=stream),
+    'naver_info': lambda stream: ghost_engine.build_naver_info(KEYWORD, stream=stream),
+    'tistory_info': lambda stream: ghost_engine.build_tistory_info(KEYWORD, stream=stream),
+    'tistory_profit': lambda stream: ghost_engine.build_tistory_profit(KEYWORD, PRODUCT, PRODUCT_URL, BANNER, stream=stream),
+}
+
+IMAGES = [{'url': f"https://images.example/{i}.jpg", 'photographer': f"photographer {i}",
+           'photo_link': f"https://unsplash.example/{i}"} for i in range(7)]
+
+ASSEMBLERS = {
+    'naver_profit': lambda data: ghost_engine.assemble_naver_profit(data, KEYWORD, PRODUCT, PRODUCT_URL),
+    'naver_info': lambda data: ghost_engine.assemble_naver_info(data, KEYWORD, IMAGES),
+    'tistory_info': lambda data: ghost_engine.assemble_tistory_info(data, KEYWORD),
+    'tistory_profit': lambda data: ghost_engine.assemble_tistory_profit(data, PRODUCT, PRODUCT_URL, BANNER),
+}
+
+# ==========================================
+# 측정 도구
+# ==========================================
+
+class StageRecorder:
+    """ghost_engine.timed 대체 - 단계별 시간(ms, 반올림 없음)과 tracemalloc 최대 할당(KB) 기록
+    단계가 중첩돼도 바깥 단계의 최대치가 유지되도록 reset_peak 전에 값을 부모에 넘김"""
+    def __init__(self):
+        self.times = {}
+        self.peaks = {}
+        self._stack = []
+
+    @contextmanager
+    def timed(self, timings, name):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame = {'start': current, 'peak': current}
+            self._stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            timings[name] = round(elapsed, 3)
+            self.times[name] = elapsed * 1000
+            if tracing:
+                self._stack.pop()
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                self.peaks[name] = (peak - frame['start']) / 1024
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+
+def run_pipeline(mode, stream, trace):
+    """파이프라인 1회 실행 → (단계별 ms, 단계별 KB)"""
+    recorder = StageRecorder()
+    original = ghost_engine.timed
+    ghost_engine.timed = recorder.timed
+    random.seed(0)
+    reset_caches(os.path.join(_workdir, "unsplash"))
+    if trace:
+        tracemalloc.start()
+    try:
+        result = PIPELINES[mode](stream)
+    finally:
+        if trace:
+            tracemalloc.stop()
+        ghost_engine.timed = original
+    # run_stages 내부에서 잰 단계(검색/이미지/생성)는 엔진 기록값 사용
+    times = {name: seconds * 1000 for name, seconds in result['timings'].items()}
+    times.update(recorder.times)
+    return times, recorder.peaks
+
+def measure_call(func, repeat, trace):
+    """func 반복 호출 → (호출당 ms 중앙값, 최대 할당 KB)"""
+    func()  # 예열
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - started >= 0.02 or number >= 1000:
+            break
+        number *= 10
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) * 1000 / number)
+    peak_kb = None
+    if trace:
+        tracemalloc.start()
+        func()
+        peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    return statistics.median(samples), peak_kb
+
+# ==========================================
+# 스위트
+# ==========================================
+
+def run_suite(modes, sizes, repeat, stream, trace, model):
+    """{케이스 id: {'ms': 중앙값, 'kb': 최대 할당}}"""
+    results = {}
+    for size in sizes:
+        for mode in modes:
+            raw = canned_article(mode, SIZES[size])
+            model.response = raw
+
+            # 파이프라인 전체 (가짜 백엔드 지연 포함)
+            samples = {}
+            for _ in range(repeat):
+                times, _ = run_pipeline(mode, stream, trace=False)
+                for stage, ms in times.items():
+                    samples.setdefault(stage, []).append(ms)
+            peaks = run_pipeline(mode, stream, trace=True)[1] if trace else {}
+            for stage, values in samples.items():
+                results[f"pipeline/{mode}/{size}/{stage}"] = {'ms': statistics.median(values), 'kb': peaks.get(stage)}
+
+            # 후처리 단계 단독 측정
+            data = ghost_engine.parse_llm_json(raw)
+            stages = {
+                'parse_llm_json': lambda: ghost_engine.parse_llm_json(raw),
+                'stream_extract': lambda: _extract(raw),
+                'validate': lambda: ghost_engine.CONTENT_RULES[mode].fix(data['content']),
+                'assemble': lambda: ASSEMBLERS[mode](data),
+            }
+            if mode == 'naver_profit':
+                stages['clean_all_tags'] = lambda: ghost_engine.clean_all_tags(data['content'])
+                stages['remove_markdown'] = lambda: ghost_engine.remove_markdown(data['content'])
+            for stage, func in stages.items():
+                ms, kb = measure_call(lambda: (random.seed(0), func()), repeat, trace)
+                results[f"stage/{mode}/{size}/{stage}"] = {'ms': ms, 'kb': kb}
+            print(f"  {mode:15s} {size:>6s} 완료", file=sys.stderr)
+    return results
+
+def _extract(raw, chunk_size=256):
+    extractor = ghost_engine.ContentStreamExtractor()
+    for i in range(0, len(raw), chunk_size):
+        extractor.feed(raw[i:i + chunk_size])
+    return extractor.content
+
+# ==========================================
+# 기준선 비교
+# ==========================================
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _git_commit():
+    """측정한 코드의 커밋 (git이 없으면 None)"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def save_baseline(path, results, settings):
+    payload = {
+        'meta': {'created_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(),
+                 'machine': platform.platform(), 'commit': _git_commit(), 'settings': settings},
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+def _fmt(value, unit):
+    return "-" if value is None else f"{value:,.3f}{unit}" if unit == "ms" else f"{value:,.1f}{unit}"
+
+def report(results, baseline, threshold):
+    """결과 표 출력 - 기준선 대비 threshold(%) 이상 느려지거나 할당이 늘면 표시. 회귀 건수 반환"""
+    base = (baseline or {}).get('results', {})
+    regressions = 0
+    print(f"{'case':52s} {'time':>14s} {'base':>14s} {'Δ':>8s} {'alloc':>12s} {'base':>12s} {'Δ':>8s}")
+    for case in sorted(results):
+        cur, old = results[case], base.get(case, {})
+        cells, flags = [], []
+        for key, unit in (('ms', 'ms'), ('kb', 'KB')):
+            now, before = cur.get(key), old.get(key)
+            change = ""
+            if now is not None and before:
+                pct = (now - before) / before * 100
+                change = f"{pct:+.0f}%"
+                if pct > threshold:
+                    flags.append("느려짐" if key == 'ms' else "할당 증가")
+            cells += [_fmt(now, unit), _fmt(before, unit), change]
+        mark = f"  ▲ {', '.join(flags)}" if flags else ""
+        regressions += bool(flags)
+        print(f"{case:52s} {cells[0]:>14s} {cells[1]:>14s} {cells[2]:>8s} {cells[3]:>12s} {cells[4]:>12s} {cells[5]:>8s}{mark}")
+    if baseline is None:
+        print("\n기준선 없음 - --save로 현재 결과를 기준선으로 저장하세요.")
+    else:
+        meta = baseline['meta']
+        commit = f" @ {meta['commit']}" if meta.get('commit') else ""
+        print(f"\n기준선: {meta['created_at']}{commit} ({meta['machine']}) / 회귀 {regressions}건 (>{threshold:g}%)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GHOST HUB 오프라인 벤치마크")
+    parser.add_argument("--modes", nargs="+", choices=list(PIPELINES), default=list(PIPELINES))
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=5, help="케이스별 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="가짜 Gemini 응답 지연 (초)")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="가짜 DuckDuckGo 응답 지연 (초)")
+    parser.add_argument("--image-latency", type=float, default=0.0, help="가짜 Unsplash 응답 지연 (초)")
+    parser.add_argument("--stream", action="store_true", help="스트리밍 생성 경로로 측정")
+    parser.add_argument("--no-alloc", action="store_true", help="메모리 할당 측정 생략")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="기준선 JSON 경로")
+    parser.add_argument("--save", action="store_true", help="측정 결과를 기준선으로 저장")
+    parser.add_argument("--threshold", type=float, default=20.0, help="회귀로 표시할 증가율 (%%)")
+    parser.add_argument("--check", action="store_true", help="회귀가 있으면 종료 코드 1")
+    parser.add_argument("--output", help="측정 결과를 이 경로에 저장 (기준선 형식, 나중에 --compare로 비교)")
+    parser.add_argument("--compare", metavar="RESULT", help="측정하지 않고 저장된 결과 JSON을 기준선과 비교")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    if args.compare:
+        if args.save:
+            parser.error("--compare와 --save는 함께 쓸 수 없습니다.")
+        current = load_baseline(args.compare)
+        if current is None or baseline is None:
+            parser.error(f"결과 파일을 읽을 수 없습니다: {args.compare if current is None else args.baseline}")
+        results, settings = current['results'], current['meta'].get('settings')
+    else:
+        model = install(args.llm_latency, args.search_latency, args.image_latency)
+        settings = {k: getattr(args, k) for k in ('repeat', 'llm_latency', 'search_latency', 'image_latency', 'stream')}
+        results = run_suite(args.modes, args.sizes, args.repeat, args.stream, not args.no_alloc, model)
+        if args.output:
+            save_baseline(args.output, results, settings)
+            print(f"결과 저장: {args.output}", file=sys.stderr)
+
+    if baseline and baseline.get('meta', {}).get('settings') != settings:
+        print(f"⚠️ 기준선 측정 조건이 다릅니다: {baseline['meta'].get('settings')}", file=sys.stderr)
+    regressions = report(results, baseline, args.threshold)
+    if args.save:
+        save_baseline(args.baseline, results, settings)
+        print(f"기준선 저장: {args.baseline}")
+    return 1 if args.check and regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
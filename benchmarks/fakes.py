@@ -0,0 +1,150 @@
+"""벤치마크/부하 테스트용 로컬 가짜 백엔드 (Gemini / DuckDuckGo / Unsplash) - 네트워크 없이 실행
+지연 시간과 오류율(error_rate: 호출마다 이 확률로 실패)을 백엔드별로 지정"""
+import json
+import time
+import random
+import asyncio
+import threading
+
+import requests
+from google.api_core import exceptions as google_errors
+
+import ghost_engine
+
+# 원고 크기 (응답 JSON의 UTF-8 바이트 기준)
+SIZES = {'2.4KB': 2_400, '25KB': 25_000, '250KB': 250_000}
+
+PARAGRAPH = ("요즘 이 주제에 관심 갖는 분들이 정말 많아졌어요. **직접 확인해 보니** 생각보다 차이가 컸고, "
+             "가격과 구성, 실제 사용감까지 꼼꼼하게 비교해 봤습니다. #핵심 포인트만 정리하면 이렇습니다.\n\n")
+
+def canned_article(mode, size_bytes):
+    """모드별 마커 형식을 따르는 고정 원고 응답 (size_bytes 근처까지 소제목/문단 반복)"""
+    tistory_profit = mode == 'tistory_profit'
+    sections = []
+    total = 0
+    while total < size_bytes:
+        n = len(sections) + 1
+        heading = f"<h3>{n}. 핵심 정리</h3>" if tistory_profit else f"[H3]{n}. 핵심 정리[/H3]"
+        section = f"{heading}\n{PARAGRAPH * 2}"
+        if n == 2:
+            section += "[CTA_1]\n" if tistory_profit else "[[CTA_1]]\n"
+        sections.append(section)
+        total += len(section.encode('utf-8'))
+    sections.append("[CTA_2]" if tistory_profit else "[[CTA_2]]")
+    data = {"title": "벤치마크 원고 제목", "content": "".join(sections), "hashtags": "#벤치 #마크"}
+    # 실제 응답처럼 JSON 앞뒤에 잡담 포함
+    return "네, 작성했습니다.\n```json\n" + json.dumps(data, ensure_ascii=False) + "\n```"
+
+class FaultInjector:
+    """호출 수/주입한 오류 수 집계 + error_rate 확률로 오류 발생 (원고 조립용 random 시드와 분리된 난수 사용)"""
+    def __init__(self, error_rate=0.0, error=RuntimeError):
+        self.error_rate = error_rate
+        self.error = error
+        self.calls = 0
+        self.errors = 0
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+
+    def __call__(self, name):
+        with self._lock:
+            self.calls += 1
+            failed = self.error_rate > 0 and self._rng.random() < self.error_rate
+            self.errors += failed
+        if failed:
+            raise self.error(f"가짜 {name} 오류 (주입)")
+
+    def reset(self):
+        with self._lock:
+            self.calls = self.errors = 0
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeModel:
+    """generate_content / 스트리밍 / 비동기 호출을 흉내내는 모델 (latency초 후 response 반환)
+    오류는 재시도 대상인 503(ServiceUnavailable)으로 주입"""
+    def __init__(self, latency=0.0, chunk_size=256, error_rate=0.0):
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.response = ""
+        self.faults = FaultInjector(error_rate, google_errors.ServiceUnavailable)
+
+    def generate_content(self, prompt, stream=False, generation_config=None, request_options=None):
+        time.sleep(self.latency)
+        self.faults("Gemini")
+        text = self.response
+        if stream:
+            return iter([FakeResponse(text[i:i + self.chunk_size]) for i in range(0, len(text), self.chunk_size)])
+        return FakeResponse(text)
+
+    async def generate_content_async(self, prompt, generation_config=None, request_options=None):
+        await asyncio.sleep(self.latency)
+        self.faults("Gemini")
+        return FakeResponse(self.response)
+
+class FakeDDGS:
+    """duckduckgo_search.DDGS 대체 (뉴스 6건)"""
+    latency = 0.0
+    faults = FaultInjector()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def news(self, keyword, **kwargs):
+        time.sleep(self.latency)
+        self.faults("DuckDuckGo")
+        return [{"title": f"{keyword} 관련 소식 {i}", "body": f"{keyword}에 대한 최신 동향과 가격 정보 요약 {i}"} for i in range(6)]
+
+    def text(self, keyword, **kwargs):
+        return self.news(keyword)
+
+class FakeHTTPResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, count):
+        self.count = count
+        self.headers = {"X-Ratelimit-Limit": "5000", "X-Ratelimit-Remaining": "4999"}
+
+    def json(self):
+        return {"results": [{"urls": {"regular": f"https://images.example/{i}.jpg"},
+                             "user": {"name": f"photographer {i}"},
+                             "links": {"html": f"https://unsplash.example/{i}"}} for i in range(self.count)]}
+
+class FakeSession:
+    """requests.Session 대체 (Unsplash 검색 응답)"""
+    def __init__(self, latency=0.0, error_rate=0.0):
+        self.latency = latency
+        self.faults = FaultInjector(error_rate, requests.exceptions.ConnectionError)
+
+    def get(self, url, params=None, **kwargs):
+        time.sleep(self.latency)
+        self.faults("Unsplash")
+        return FakeHTTPResponse((params or {}).get('per_page', 5))
+
+    def head(self, url, **kwargs):
+        return FakeHTTPResponse(0)
+
+def install(llm_latency=0.0, search_latency=0.0, image_latency=0.0, llm_error_rate=0.0, search_error_rate=0.0,
+            image_error_rate=0.0):
+    """엔진 모듈의 외부 의존성을 가짜로 교체하고 FakeModel 반환 (response는 호출 측에서 설정)"""
+    model = FakeModel(llm_latency, error_rate=llm_error_rate)
+    FakeDDGS.latency = search_latency
+    FakeDDGS.faults = FaultInjector(search_error_rate)
+    ghost_engine.DDGS = FakeDDGS
+    ghost_engine.http_session = FakeSession(image_latency, image_error_rate)
+    ghost_engine.warm_connections = lambda: None   # 앱 시작 시 Gemini/Unsplash 연결 예열 생략
+    ghost_engine._model = model
+    ghost_engine.get_model = lambda mode=None: model   # 모드별 규칙 모델/컨텍스트 캐시 생성도 건너뜀
+    ghost_engine.config.update(api_key='bench', unsplash_key='bench', model_name='bench')
+    ghost_engine.VALIDATE_MAX_REPAIRS = 0   # 고정 원고는 글자 수 규칙과 맞지 않으므로 로컬 교정만 측정
+    return model
+
+def reset_caches(cache_dir):
+    """실행마다 검색/이미지 캐시를 비워 매번 전체 경로를 측정"""
+    ghost_engine._search_cache = ghost_engine.TTLCache(ghost_engine.SEARCH_CACHE_TTL, ghost_engine.SEARCH_CACHE_SIZE)
+    ghost_engine.unsplash_cache = ghost_engine.DiskCache(cache_dir, 0)
@@ -0,0 +1,300 @@
+"""GHOST HUB 다중 세션 부하 테스트 (오프라인)
+
+Streamlit AppTest로 세션 N개를 동시에 띄워 각 세션이 네 가지 모드를 차례로 생성하게 하고
+(입력 → 생성 버튼 → 완료될 때까지 재실행으로 상태 확인), 동시 세션 수를 늘려 가며
+재실행 지연, 생성 처리량/지연, 세션당 메모리, 오류율을 측정.
+Gemini / DuckDuckGo / Unsplash는 지연 시간과 오류율을 지정할 수 있는 로컬 가짜 백엔드로 대체.
+GEMINI_RPM / GEMINI_CONCURRENCY / GHOST_JOB_WORKERS 등 환경 변수는 앱과 똑같이 적용됨.
+
+    python benchmarks/loadtest.py                                   # 세션 1, 2, 4, 8
+    python benchmarks/loadtest.py --sessions 4 16 32 --llm-latency 8 --llm-error-rate 0.05
+    python benchmarks/loadtest.py --modes naver_info --size 250KB --json loadtest.json
+"""
+import os
+import gc
+import sys
+import json
+import time
+import atexit
+import shutil
+import argparse
+import tempfile
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "GHOST_HUB.py")
+sys.path.insert(0, ROOT)
+
+# 생성 결과 저장은 임시 DB로, 키는 가짜 값으로 (import 전에 설정)
+_workdir = tempfile.mkdtemp(prefix="ghost-load-")
+atexit.register(shutil.rmtree, _workdir, ignore_errors=True)
+os.environ["GHOST_DB_PATH"] = os.path.join(_workdir, "load.db")
+os.environ["GEMINI_API_KEY"] = "loadtest"
+os.environ["UNSPLASH_ACCESS_KEY"] = "loadtest"
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import ghost_engine  # noqa: E402
+import ghost_jobs  # noqa: E402
+from ghost_metrics import metrics  # noqa: E402
+from fakes import SIZES, FakeDDGS, FakeModel, canned_article, install, reset_caches  # noqa: E402
+
+KEYWORD = "겨울철 전기요금 절약"
+PRODUCT = "다이슨 V15"
+PRODUCT_URL = "https://link.coupang.com/a/load"
+
+# 모드 → (생성 버튼 key, 입력 key → 값) - 키워드는 세션별로 달리 해 검색/이미지 캐시 합류를 피함
+SCENARIOS = {
+    'naver_profit': ("naver_profit_btn", {'naver_profit_kw': KEYWORD, 'naver_profit_prod': PRODUCT,
+                                          'naver_profit_url': PRODUCT_URL}),
+    'naver_info': ("naver_info_btn", {'naver_info_kw': KEYWORD}),
+    'tistory_info': ("tistory_info_btn", {'tistory_info_kw': KEYWORD}),
+    'tistory_profit': ("tp_btn", {'tp_kw': KEYWORD, 'tp_prod': PRODUCT, 'tp_url': PRODUCT_URL}),
+}
+
+# ==========================================
+# 측정 도구
+# ==========================================
+
+def rss_bytes():
+    """현재 프로세스 RSS (바이트)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource   # /proc이 없는 OS (macOS 등)는 최대 RSS로 대체
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == "darwin" else usage * 1024
+
+def state_bytes(at):
+    """세션 상태 크기 - 문자열/바이트 값 기준 (결과 HTML 등)"""
+    total = 0
+    for value in at.session_state.to_dict().values():
+        if isinstance(value, str):
+            total += len(value.encode('utf-8'))
+        elif isinstance(value, bytes):
+            total += len(value)
+        else:
+            total += sys.getsizeof(value)
+    return total
+
+def page_bytes(node):
+    """화면 요소 메시지 크기 합 (브라우저로 보내는 양의 근사치)"""
+    proto = getattr(node, 'proto', None)
+    total = proto.ByteSize() if proto is not None else 0
+    for child in getattr(node, 'children', {}).values():
+        total += page_bytes(child)
+    return total
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+# ==========================================
+# 세션 시나리오
+# ==========================================
+
+# AppTest는 실행마다 전역 Runtime을 바꿔 끼우므로 여러 스레드에서 동시에 돌릴 수 없음
+# → 스크립트 재실행은 한 번에 하나씩 (생성 작업은 작업 큐 워커에서 그대로 동시에 진행)
+_run_lock = threading.Lock()
+
+class Session:
+    """AppTest 세션 1개 - 재실행마다 소요 시간(차례 대기 제외)/대기 시간/예외를 기록"""
+    def __init__(self, index, timeout):
+        self.index = index
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.reruns = []        # 재실행 소요 (초)
+        self.waits = []         # 다른 세션 재실행이 끝나기를 기다린 시간 (초)
+        self.generations = []   # 생성 버튼 → 결과 반영까지 (초)
+        self.failed = 0
+        self.timeouts = 0
+        self.exceptions = []
+
+    def run(self):
+        queued = time.perf_counter()
+        with _run_lock:
+            started = time.perf_counter()
+            try:
+                self.at.run()
+            except Exception as e:   # AppTest 자체 실패 (재실행 마감 초과 등)
+                self.exceptions.append(f"{type(e).__name__}: {e}")
+            self.reruns.append(time.perf_counter() - started)
+        self.waits.append(started - queued)
+        self.exceptions += [element.value for element in self.at.exception]
+
+    def delivered(self):
+        return len(self.at.session_state['delivered_jobs']) if 'delivered_jobs' in self.at.session_state else 0
+
+    def generate(self, mode, think, gen_timeout):
+        """모드 선택 → 입력 → 생성 → 결과가 반영될 때까지 think초 간격으로 재실행"""
+        button, inputs = SCENARIOS[mode]
+        radio = self.at.sidebar.radio[0]
+        radio.set_value(next(option for option in radio.options if ghost_engine.BATCH_MODES[mode][0] in option))
+        self.run()
+        for key, value in inputs.items():
+            self.at.text_input(key=key).input(f"{value} {self.index}" if key.endswith('kw') else value)
+        expected = self.delivered() + 1
+        self.at.button(key=button).click()
+        started = time.perf_counter()
+        self.run()
+        while self.delivered() < expected:
+            if time.perf_counter() - started > gen_timeout:
+                self.timeouts += 1
+                return
+            time.sleep(think)
+            self.run()
+        self.generations.append(time.perf_counter() - started)
+        owner = self.at.query_params['jobs']
+        jobs = ghost_jobs.get_queue().jobs(owner[0] if isinstance(owner, list) else owner)
+        if jobs and jobs[-1].status != ghost_jobs.DONE:
+            self.failed += 1
+
+def run_session(index, modes, rounds, stream, think, gen_timeout, timeout, start):
+    session = Session(index, timeout)
+    start.wait()
+    session.run()
+    if stream:
+        session.at.sidebar.toggle(key="stream_mode").set_value(True)
+        session.run()
+    order = modes[index % len(modes):] + modes[:index % len(modes)]   # 세션마다 시작 모드를 달리 함
+    for _ in range(rounds):
+        for mode in order:
+            session.generate(mode, think, gen_timeout)
+    return session
+
+# ==========================================
+# 부하 단계
+# ==========================================
+
+def reset_environment():
+    """단계마다 작업 큐/계측/캐시/오류 집계를 새로 시작"""
+    old = ghost_jobs._queue
+    ghost_jobs._queue = None
+    if old is not None:
+        old._pool.shutdown(wait=False, cancel_futures=True)
+    metrics.reset()
+    reset_caches(os.path.join(_workdir, "unsplash"))
+    for faults in faults_all():
+        faults.reset()
+
+def faults_all():
+    return [_models['faults'], FakeDDGS.faults, ghost_engine.http_session.faults]
+
+def run_level(sessions, modes, args):
+    """동시 세션 sessions개로 1단계 실행 → 결과 dict"""
+    reset_environment()
+    gc.collect()
+    rss_before = rss_bytes()
+    start = threading.Event()
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="load-session") as pool:
+        futures = [pool.submit(run_session, i, modes, args.rounds, args.stream, args.think, args.gen_timeout,
+                               args.rerun_timeout, start) for i in range(sessions)]
+        start.set()
+        results = [future.result() for future in futures]
+    wall = time.perf_counter() - began
+    gc.collect()
+    rss_after = rss_bytes()
+
+    reruns = [t for s in results for t in s.reruns]
+    waits = [t for s in results for t in s.waits]
+    generations = [t for s in results for t in s.generations]
+    attempted = sessions * args.rounds * len(modes)
+    failed = sum(s.failed + s.timeouts for s in results)
+    exceptions = [e for s in results for e in s.exceptions]
+    queue = next((row for row in metrics.summary() if row['stage'] == 'gemini_queue'), None)
+    gemini, search, images = faults_all()
+    return {
+        'sessions': sessions, 'attempted': attempted, 'completed': len(generations) - sum(s.failed for s in results),
+        'failed': failed, 'error_rate': failed / attempted if attempted else 0.0, 'exceptions': len(exceptions),
+        'first_exception': exceptions[0] if exceptions else "",
+        'throughput_per_min': (len(generations) - sum(s.failed for s in results)) / wall * 60 if wall else 0.0, 'wall_s': wall,
+        'rerun_p50_ms': (percentile(reruns, 0.5) or 0) * 1000, 'rerun_p95_ms': (percentile(reruns, 0.95) or 0) * 1000,
+        'rerun_max_ms': max(reruns, default=0) * 1000, 'rerun_wait_p95_ms': (percentile(waits, 0.95) or 0) * 1000,
+        'gen_p50_s': percentile(generations, 0.5), 'gen_p95_s': percentile(generations, 0.95),
+        'gemini_queue_p95_s': queue['p95'] if queue else None,
+        'rss_per_session_mb': max(0, rss_after - rss_before) / sessions / 1024 / 1024,
+        'state_per_session_kb': statistics.mean(state_bytes(s.at) for s in results) / 1024,
+        'page_per_session_kb': statistics.mean(page_bytes(s.at._tree) for s in results) / 1024,
+        'faults': {'gemini': [gemini.errors, gemini.calls], 'search': [search.errors, search.calls],
+                   'images': [images.errors, images.calls]},
+    }
+
+def _fmt(value, digits=1):
+    return "-" if value is None else f"{value:,.{digits}f}"
+
+def report(levels):
+    print(f"{'세션':>4s} {'생성':>5s} {'실패':>4s} {'오류율':>7s} {'건/분':>7s} {'재실행 p50':>10s} {'p95':>8s} {'최대':>8s} {'차례 p95':>8s} "
+          f"{'생성 p50':>8s} {'p95':>7s} {'대기 p95':>8s} {'RSS/세션':>9s} {'상태/세션':>9s} {'화면/세션':>9s} {'예외':>4s}")
+    for r in levels:
+        print(f"{r['sessions']:>4d} {r['completed']:>5d} {r['failed']:>4d} {r['error_rate'] * 100:>6.1f}% "
+              f"{r['throughput_per_min']:>7.1f} {_fmt(r['rerun_p50_ms'], 0):>8s}ms {_fmt(r['rerun_p95_ms'], 0):>6s}ms "
+              f"{_fmt(r['rerun_max_ms'], 0):>6s}ms {_fmt(r['rerun_wait_p95_ms'], 0):>6s}ms {_fmt(r['gen_p50_s'], 2):>7s}s {_fmt(r['gen_p95_s'], 2):>6s}s "
+              f"{_fmt(r['gemini_queue_p95_s'], 2):>7s}s {_fmt(r['rss_per_session_mb']):>7s}MB "
+              f"{_fmt(r['state_per_session_kb']):>7s}KB {_fmt(r['page_per_session_kb']):>7s}KB {r['exceptions']:>4d}")
+    print()
+    for r in levels:
+        faults = " / ".join(f"{name} {errors}/{calls}" for name, (errors, calls) in r['faults'].items())
+        line = f"세션 {r['sessions']}: 주입 오류(오류/호출) {faults}, 소요 {r['wall_s']:.1f}초"
+        if r['first_exception']:
+            line += f", 첫 예외: {r['first_exception'][:120]}"
+        print(line)
+
+_models = {}
+
+def install_backends(args):
+    """가짜 백엔드 설치 - 모드마다 그 모드 형식의 고정 원고를 돌려주는 모델 (오류 주입/집계는 공유)"""
+    base = install(args.llm_latency, args.search_latency, args.image_latency, args.llm_error_rate,
+                   args.search_error_rate, args.image_error_rate)
+    models = {}
+    for mode in SCENARIOS:
+        model = FakeModel(args.llm_latency)
+        model.faults = base.faults
+        model.response = canned_article(mode, SIZES[args.size])
+        models[mode] = model
+    base.response = models['naver_profit'].response
+    ghost_engine.get_model = lambda mode=None: models.get(mode, base)
+    _models['faults'] = base.faults
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GHOST HUB 다중 세션 부하 테스트 (오프라인)")
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 2, 4, 8], help="동시 세션 수 (단계별)")
+    parser.add_argument("--modes", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--rounds", type=int, default=1, help="세션마다 모드 전체를 반복할 횟수")
+    parser.add_argument("--size", choices=list(SIZES), default='25KB', help="가짜 원고 응답 크기")
+    parser.add_argument("--llm-latency", type=float, default=2.0, help="가짜 Gemini 응답 지연 (초)")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="가짜 DuckDuckGo 응답 지연 (초)")
+    parser.add_argument("--image-latency", type=float, default=0.3, help="가짜 Unsplash 응답 지연 (초)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="가짜 Gemini 오류율 (503, 재시도 대상)")
+    parser.add_argument("--search-error-rate", type=float, default=0.0, help="가짜 DuckDuckGo 오류율")
+    parser.add_argument("--image-error-rate", type=float, default=0.0, help="가짜 Unsplash 오류율")
+    parser.add_argument("--stream", action="store_true", help="스트리밍 미리보기를 켜고 측정")
+    parser.add_argument("--think", type=float, default=1.0, help="진행 중 상태 확인 재실행 간격 (초, 앱 갱신 주기)")
+    parser.add_argument("--gen-timeout", type=float, default=300.0, help="생성 1건 대기 한도 (초, 넘으면 실패)")
+    parser.add_argument("--rerun-timeout", type=float, default=60.0, help="재실행 1회 한도 (초)")
+    parser.add_argument("--json", help="단계별 결과를 JSON으로 저장할 경로")
+    args = parser.parse_args(argv)
+
+    install_backends(args)
+    # 예열 - 모든 모드를 1번씩 생성해 지연 import/캐시 생성 등 1회성 비용을 첫 단계 측정에서 제외
+    warmup = threading.Event()
+    warmup.set()
+    run_session(-1, args.modes, 1, args.stream, min(args.think, 0.2), args.gen_timeout, args.rerun_timeout, warmup)
+    levels = []
+    for sessions in args.sessions:
+        print(f"세션 {sessions}개 실행 중...", file=sys.stderr)
+        levels.append(run_level(sessions, args.modes, args))
+    report(levels)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'settings': vars(args), 'levels': levels}, f, ensure_ascii=False, indent=1)
+        print(f"결과 저장: {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
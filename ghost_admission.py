@@ -0,0 +1,176 @@
+"""GHOST HUB Gemini 호출 입장 제어 - 프로세스 공용 속도 제한(토큰 버킷) + 동시 호출 상한 + 세션별 공정 대기열"""
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+GEMINI_RPM = float(os.getenv("GEMINI_RPM") or 0)                # 분당 요청 한도 (0이면 속도 제한 없음)
+GEMINI_BURST = int(os.getenv("GEMINI_BURST") or 0)              # 몰아서 허용할 요청 수 (0이면 분당 한도의 1/10, 최소 1)
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY") or 8)  # 동시 호출 상한
+ASYNC_POLL_INTERVAL = 0.05   # 비동기 대기 중 차례 확인 간격 (초)
+SERVICE_SMOOTHING = 0.2      # 호출 소요 시간 이동 평균 가중치
+
+# 현재 작업의 소유자 (세션) - 스레드/태스크로 전파되도록 contextvar 사용
+_owner = contextvars.ContextVar('ghost_admission_owner', default='')
+
+@contextmanager
+def admission_owner(owner):
+    """with 블록 안의 Gemini 호출을 owner(세션) 줄에 세움"""
+    token = _owner.set(owner or '')
+    try:
+        yield
+    finally:
+        _owner.reset(token)
+
+class AdmissionController:
+    """Gemini 호출 입장 제어 (프로세스 공용, 스레드 안전)
+    - 토큰 버킷: 분당 rpm회, 최대 burst회까지 연속 허용
+    - 동시 호출 상한: concurrency
+    - 공정 대기열: 소유자(세션)별 줄을 돌아가며 1건씩 입장 (한 세션이 몰아 넣어도 다른 세션이 밀리지 않음)"""
+    def __init__(self, rpm=GEMINI_RPM, burst=GEMINI_BURST, concurrency=GEMINI_CONCURRENCY):
+        self.rate = rpm / 60
+        self.burst = burst or max(1, round(rpm / 10))
+        self.concurrency = concurrency
+        self._cond = threading.Condition()
+        self._lines = OrderedDict()   # 소유자 → deque[티켓], 맨 앞 소유자가 다음 차례
+        self._active = 0
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._service = 0.0           # 호출 1건 평균 소요 (초)
+
+    # --- 잠금 안에서만 호출 ---
+
+    def _refill(self, now):
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _ready_in(self, now):
+        """지금 입장 가능하면 0, 시간이 지나면 가능하면 남은 초, 다른 호출이 끝나야 하면 None"""
+        if self._active >= self.concurrency:
+            return None
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.rate:
+            self._refill(now)
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+        return 0
+
+    def _wait_time(self, owner, ticket, now):
+        first_owner, first_line = next(iter(self._lines.items()))
+        if first_owner != owner or first_line[0] is not ticket:
+            return None   # 차례가 아님
+        return self._ready_in(now)
+
+    def _enqueue(self, owner):
+        ticket = object()
+        self._lines.setdefault(owner, deque()).append(ticket)
+        return ticket
+
+    def _take(self):
+        if self.rate:
+            self._tokens -= 1
+        self._active += 1
+
+    def _grant(self, owner):
+        line = self._lines[owner]
+        line.popleft()
+        if line:
+            self._lines.move_to_end(owner)   # 다음 차례는 다른 소유자
+        else:
+            del self._lines[owner]
+        self._take()
+        self._cond.notify_all()
+
+    def _remove(self, owner, ticket):
+        line = self._lines.get(owner)
+        if line is not None and ticket in line:
+            line.remove(ticket)
+            if not line:
+                del self._lines[owner]
+            self._cond.notify_all()
+
+    # --- 공개 API ---
+
+    def acquire(self, owner=None):
+        """차례가 올 때까지 대기 후 입장 → 대기한 시간(초). 끝나면 release() 호출"""
+        owner = _owner.get() if owner is None else owner
+        started = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(owner)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = self._wait_time(owner, ticket, now)
+                    if delay == 0:
+                        self._grant(owner)
+                        return now - started
+                    self._cond.wait(delay)
+            except BaseException:
+                self._remove(owner, ticket)
+                raise
+
+    async def acquire_async(self, owner=None):
+        """acquire의 비동기 버전 (이벤트 루프를 막지 않도록 짧게 나눠 대기, 취소되면 줄에서 빠짐)"""
+        owner = _owner.get() if owner is None else owner
+        started = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(owner)
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    delay = self._wait_time(owner, ticket, now)
+                    if delay == 0:
+                        self._grant(owner)
+                        return now - started
+                await asyncio.sleep(ASYNC_POLL_INTERVAL if delay is None else min(delay, ASYNC_POLL_INTERVAL))
+        except BaseException:
+            with self._cond:
+                self._remove(owner, ticket)
+            raise
+
+    def try_acquire(self):
+        """대기 없이 바로 입장 가능할 때만 입장 (헤지 요청용 - 기다리는 호출이 있으면 양보)"""
+        with self._cond:
+            if self._lines or self._ready_in(time.monotonic()) != 0:
+                return False
+            self._take()
+            return True
+
+    def release(self, seconds=None):
+        """호출 종료 (seconds: 호출 소요 시간 - 예상 대기 시간 계산에 사용)"""
+        with self._cond:
+            self._active -= 1
+            if seconds is not None:
+                self._service = seconds if not self._service else \
+                    (1 - SERVICE_SMOOTHING) * self._service + SERVICE_SMOOTHING * seconds
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        """한도 초과(429) 응답 시 모든 세션의 새 입장을 잠시 멈춤 (재시도가 한꺼번에 몰리지 않도록)"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def status(self, owner=None):
+        """대기열 상태 {'position': 소유자의 첫 대기 요청 순번(대기 없으면 None), 'queued': 소유자 대기 수,
+        'waiting': 전체 대기 수, 'active': 실행 중, 'eta': 예상 대기(초)}"""
+        owner = _owner.get() if owner is None else owner
+        with self._cond:
+            owners = list(self._lines)
+            position = owners.index(owner) + 1 if owner in self._lines else None
+            interval = max(1 / self.rate if self.rate else 0, self._service / self.concurrency)
+            eta = None
+            if position is not None:
+                eta = max(0.0, self._paused_until - time.monotonic()) + position * interval
+            return {'position': position, 'queued': len(self._lines.get(owner, ())),
+                    'waiting': sum(len(line) for line in self._lines.values()),
+                    'active': self._active, 'eta': eta}
+
+admission = AdmissionController()
@@ -0,0 +1,2697 @@
+"""GHOST HUB 생성 엔진 - Streamlit 없이 import/CLI로 사용 가능한 원고 생성 파이프라인
+
+    python ghost_engine.py naver_profit --keyword "무선 청소기" --product "다이슨 V15" --url https://...
+    python ghost_engine.py batch rows.csv --concurrency 8 --out results.jsonl
+    python ghost_engine.py --metrics-prom ghost.prom batch rows.csv
+"""
+import google.generativeai as genai
+from google.api_core import exceptions as google_errors
+import requests
+import random
+import os
+import io
+import csv
+import json
+import re
+import sys
+import time
+import asyncio
+import argparse
+import threading
+import queue
+import hashlib
+import datetime
+import zlib
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from duckduckgo_search import DDGS
+from dotenv import load_dotenv
+from ghost_store import get_store, normalize_keyword
+from ghost_metrics import metrics, metric_labels
+from ghost_admission import admission
+
+# ==========================================
+# 1. 설정
+# ==========================================
+
+load_dotenv()
+
+MODEL_NAME = os.getenv("GEMINI_MODEL") or 'gemini-3-flash-preview'
+
+config = {'api_key': None, 'unsplash_key': None, 'model_name': None}
+_model = None
+_config_lock = threading.Lock()
+
+def configure(api_key, unsplash_key=None, model_name=MODEL_NAME, warm=False):
+    """API 키 설정 및 Gemini 모델 생성 (프로세스 1회)
+    같은 설정으로 다시 호출하면 기존 클라이언트를 그대로 사용. warm=True면 백그라운드로 연결 예열"""
+    global _model
+    with _config_lock:
+        if _model is not None and config == {'api_key': api_key, 'unsplash_key': unsplash_key, 'model_name': model_name}:
+            return _model
+        genai.configure(api_key=api_key)
+        _model = genai.GenerativeModel(model_name)
+        config.update(api_key=api_key, unsplash_key=unsplash_key, model_name=model_name)
+        mode_models.clear()
+    if warm:
+        threading.Thread(target=warm_connections, name="ghost-warmup", daemon=True).start()
+    return _model
+
+def get_model(mode=None):
+    """기본 모델. mode를 주면 그 모드의 고정 규칙(system instruction)이 적용된 모델"""
+    if _model is None:
+        raise RuntimeError("GEMINI_API_KEY가 설정되지 않았습니다. configure()를 먼저 호출하세요.")
+    if mode is None:
+        return _model
+    return mode_models.get(mode)
+
+# ==========================================
+# 2. 공통 함수
+# ==========================================
+
+FALLBACK_FACTS = "최신 트렌드 분석을 기반으로 집필합니다."
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL") or 1800)   # 초
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE") or 256)
+
+class TTLCache:
+    """TTL + LRU 캐시 (스레드 안전)"""
+    def __init__(self, ttl, maxsize):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+# 프로세스 공용 검색 캐시 (세션/재실행 간 공유)
+_search_cache = TTLCache(SEARCH_CACHE_TTL, SEARCH_CACHE_SIZE)
+
+class SingleFlight:
+    """같은 키의 동시 호출을 하나로 합침 - 먼저 온 호출만 실행하고 나머지는 그 결과(또는 예외)를 공유"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0   # 합쳐진(상류 호출을 생략한) 호출 수
+
+    def do(self, key, func, *args):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+        try:
+            result = func(*args)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+class ClientPool:
+    """재사용 클라이언트 풀 (동시 사용 최대 size개, 오류가 난 클라이언트는 버리고 새로 생성)"""
+    def __init__(self, factory, size):
+        self.factory = factory
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def client(self):
+        with self._slots:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                client = self.factory()
+            yield client
+            self._idle.put(client)   # 예외가 나면 여기까지 오지 않으므로 버려짐
+
+DDGS_POOL_SIZE = int(os.getenv("DDGS_POOL_SIZE") or 4)
+
+# 세션 간 공유: 같은 검색/이미지 요청 합치기 + DDGS 클라이언트 재사용
+search_flight = SingleFlight()
+image_flight = SingleFlight()
+ddgs_pool = ClientPool(lambda: DDGS(), DDGS_POOL_SIZE)
+
+# 검색 결과 압축 (중복 기사 제거 + 키워드 관련도 순 + 토큰 예산)
+FACTS_TOKEN_BUDGET = int(os.getenv("FACTS_TOKEN_BUDGET") or 600)
+FACTS_DUP_THRESHOLD = float(os.getenv("FACTS_DUP_THRESHOLD") or 0.6)   # MinHash 유사도 이상이면 중복
+FACTS_MIN_BODY_TOKENS = 20   # 남은 예산에 맞춰 자른 본문이 이보다 짧으면 그 기사부터는 넣지 않음
+SHINGLE_SIZE = 3
+MINHASH_PRIME = (1 << 61) - 1
+# 전역 random 상태를 건드리지 않도록 별도 생성기로 고정 계수 생성
+_minhash_rng = random.Random(13)
+MINHASH_COEFFS = [(_minhash_rng.randrange(1, MINHASH_PRIME), _minhash_rng.randrange(MINHASH_PRIME)) for _ in range(64)]
+
+def estimate_tokens(text):
+    """토큰 수 근사 (UTF-8 4바이트당 1토큰 - 한글 약 0.75토큰/글자, 영문 약 4글자/토큰)"""
+    return -(-len(text.encode('utf-8')) // 4)
+
+def shingles(text, size=SHINGLE_SIZE):
+    """공백/문장부호를 뺀 글자 n-gram 집합 (띄어쓰기가 다른 같은 기사도 잡히도록)"""
+    normalized = re.sub(r'[\W_]+', '', text.lower())
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+def minhash_signature(shingle_set):
+    """MinHash 서명 (빈 집합이면 None)"""
+    if not shingle_set:
+        return None
+    hashes = [zlib.crc32(s.encode('utf-8')) for s in shingle_set]
+    return tuple(min((a * h + b) % MINHASH_PRIME for h in hashes) for a, b in MINHASH_COEFFS)
+
+def minhash_similarity(sig1, sig2):
+    """두 서명의 추정 Jaccard 유사도"""
+    return sum(x == y for x, y in zip(sig1, sig2)) / len(sig1)
+
+def keyword_overlap(keyword, text):
+    """키워드 단어(2점)와 단어 내 2글자 조각(1점)이 본문에 등장한 정도"""
+    text = text.lower()
+    score = 0
+    for word in normalize_keyword(keyword).split():
+        score += 2 * (word in text)
+        score += sum(word[i:i + 2] in text for i in range(len(word) - 1))
+    return score
+
+def _truncate_to_tokens(text, tokens):
+    """토큰 예산에 맞게 뒤를 자름 (UTF-8 글자 경계 유지)"""
+    cut = text.encode('utf-8')[:max(0, tokens * 4 - 3)].decode('utf-8', errors='ignore')
+    return cut + "…" if cut != text else text
+
+def compress_facts(results, keyword, budget=FACTS_TOKEN_BUDGET, threshold=FACTS_DUP_THRESHOLD):
+    """검색 결과 → 프롬프트용 정보 문자열
+    거의 같은 기사(통신사 기사 재전송 등)는 먼저 나온 것만 남기고, 키워드 겹침 순으로 토큰 예산 안에서 채움"""
+    candidates, signatures = [], []
+    for rank, r in enumerate(results):
+        title, body = (r.get('title') or '').strip(), (r.get('body') or '').strip()
+        if not (title or body):
+            continue
+        signature = minhash_signature(shingles(title + body))
+        if signature and any(minhash_similarity(signature, other) >= threshold for other in signatures):
+            continue
+        if signature:
+            signatures.append(signature)
+        candidates.append((-keyword_overlap(keyword, f"{title} {body}"), rank, title, body))
+    
+    # 키워드와 관련 있는 기사가 하나라도 있으면 무관한 기사(겹침 0)는 제외
+    if any(score < 0 for score, *_ in candidates):
+        candidates = [c for c in candidates if c[0] < 0]
+    
+    snippets, remaining = [], budget
+    for _, _, title, body in sorted(candidates):
+        snippet = f"정보원: {title}\n핵심내용: {body}\n\n"
+        cost = estimate_tokens(snippet)
+        if cost > remaining:
+            # 남은 예산보다 긴 기사는 본문을 남은 예산에 맞게 잘라서 사용 (관련도 순서 유지)
+            # 가장 관련 있는 첫 기사는 아무리 짧게 잘려도 사용
+            header = f"정보원: {title}\n핵심내용: "
+            room = remaining - estimate_tokens(header) - 1
+            if snippets and room < FACTS_MIN_BODY_TOKENS:
+                break
+            snippet = f"{header}{_truncate_to_tokens(body, room)}\n\n"
+            cost = estimate_tokens(snippet)
+        snippets.append(snippet)
+        remaining -= cost
+    return "".join(snippets)
+
+def hunt_realtime_info(keyword, region='kr-kr', timelimit='w'):
+    """실시간 정보 수집 (키워드/지역/기간 기준 캐시)
+    다른 세션이 같은 검색을 진행 중이면 새로 검색하지 않고 그 결과를 공유"""
+    key = (normalize_keyword(keyword), region, timelimit)
+    cached = _search_cache.get(key)
+    if cached is not None:
+        return cached
+    return search_flight.do(key, _search_news, key, keyword, region, timelimit)
+
+def _search_news(key, keyword, region, timelimit):
+    try:
+        with ddgs_pool.client() as ddgs:
+            results = list(ddgs.news(keyword, region=region, safesearch='off', timelimit=timelimit, max_results=6))
+            if not results:
+                results = list(ddgs.text(keyword, region=region, max_results=6))
+        context = compress_facts(results, keyword)
+    except:
+        return FALLBACK_FACTS
+    if not context:
+        return FALLBACK_FACTS
+    # 실제 검색 결과만 캐시 (폴백 문구는 캐시하지 않음)
+    _search_cache.set(key, context)
+    return context
+
+# 후처리용 패턴/변환표 (모듈 로드 시 1회 컴파일)
+TAG_PATTERN = re.compile(r'<[^>]*>')
+MARKDOWN_CHARS = str.maketrans('', '', '#*')
+
+def clean_all_tags(text):
+    """HTML 태그 제거"""
+    # 제거 순서(** → __ → * #)가 결과에 영향을 주므로 순서 유지
+    text = TAG_PATTERN.sub('', text)
+    text = text.replace("**", "").replace("__", "").translate(MARKDOWN_CHARS)
+    return text.strip()
+
+def remove_markdown(text):
+    """마크다운 완전 제거"""
+    return text.translate(MARKDOWN_CHARS).replace('__', '')
+
+class MarkupRenderer:
+    """소제목/CTA 마커 치환기 - 원고를 한 번만 스캔해 조각 목록으로 만들고 마지막에 1회 join
+    h3_pattern: 그룹 1이 소제목 텍스트인 패턴, cta_pattern: 그룹 1이 CTA 번호인 패턴"""
+    def __init__(self, h3_pattern, cta_pattern=None):
+        self.h3_re = re.compile(h3_pattern)
+        self.cta_re = re.compile(cta_pattern) if cta_pattern else None
+
+    def render(self, text, style_h3, before_first_h3=""):
+        """소제목을 등장 순서대로 style_h3로 변환 (난수 호출 순서 유지)
+        반환: (조각 목록, CTA 자리 [(조각 인덱스, 번호)]) - CTA는 join()에서 채움"""
+        pieces, slots = [], []
+
+        def emit(segment):
+            pos = 0
+            if self.cta_re is not None:
+                for m in self.cta_re.finditer(segment):
+                    pieces.append(segment[pos:m.start()])
+                    slots.append((len(pieces), m.group(1)))
+                    pieces.append('')
+                    pos = m.end()
+            pieces.append(segment[pos:] if pos else segment)
+
+        pos = 0
+        for i, m in enumerate(self.h3_re.finditer(text)):
+            emit(text[pos:m.start()])
+            styled = style_h3(m.group(1))
+            emit(before_first_h3 + styled if i == 0 else styled)
+            pos = m.end()
+        emit(text[pos:])
+        return pieces, slots
+
+    def sections(self, text):
+        """소제목 경계로 원고 분할 → [도입부, 소제목1 섹션, 소제목2 섹션, ...] (이어 붙이면 원문 그대로)"""
+        bounds = [0] + [m.start() for m in self.h3_re.finditer(text)] + [len(text)]
+        return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    def heading(self, section):
+        """섹션의 소제목 텍스트 (도입부면 None)"""
+        m = self.h3_re.search(section)
+        return m.group(1) if m else None
+
+    @staticmethod
+    def join(pieces, slots=(), cta_html=None):
+        """CTA 자리를 cta_html(번호, n번째 등장)으로 채운 뒤 1회 join"""
+        seen = {}
+        for index, number in slots:
+            nth = seen.get(number, 0)
+            seen[number] = nth + 1
+            pieces[index] = cta_html(number, nth)
+        return ''.join(pieces)
+
+# 모드별 마커 형식
+NAVER_MARKUP = MarkupRenderer(r'\[H3\](.*?)\[/H3\]', r'\[\[CTA_(\d+)\]\]')
+H3_MARKUP = MarkupRenderer(r'\[H3\](.*?)\[/H3\]')
+TISTORY_PROFIT_MARKUP = MarkupRenderer(r'<h3>(.*?)</h3>', r'\[CTA_([12])\]')
+
+class PhraseMatcher:
+    """다중 문구 검색기 (Aho-Corasick) - 미리 만든 오토마톤으로 문구 수와 관계없이 본문을 한 번만 훑음
+    phrases: {문구: 분류}"""
+    def __init__(self, phrases):
+        self._goto = [{}]    # 노드별 다음 글자 → 노드
+        self._fail = [0]     # 실패 링크
+        self._out = [[]]     # 노드에서 끝나는 (문구, 분류)
+        for phrase, kind in phrases.items():
+            node = 0
+            for ch in phrase:
+                if ch not in self._goto[node]:
+                    self._goto[node][ch] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = self._goto[node][ch]
+            self._out[node].append((phrase, kind))
+        # 실패 링크는 얕은 노드부터 (BFS) - 접미사로 끝나는 문구도 출력에 합침
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for ch, child in self._goto[node].items():
+                pending.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def scan(self, text):
+        """본문 1회 스캔 → (등장 목록 [(시작, 끝, 문구, 분류)], 태그 밖 글자 수)
+        HTML 태그(<...>) 안은 건너뛰고 글자 수에서도 뺌 (태그를 사이에 둔 문구는 찾지 않음)"""
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        visible = 0
+        node = 0
+        in_tag = False
+        for i, ch in enumerate(text):
+            if in_tag:
+                in_tag = ch != '>'
+                continue
+            if ch == '<' and (text[i + 1:i + 2].isalpha() or text[i + 1:i + 2] == '/'):
+                in_tag = True
+                node = 0
+                continue
+            visible += 1
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for phrase, kind in out[node]:
+                matches.append((i + 1 - len(phrase), i + 1, phrase, kind))
+        return matches, visible
+
+STYLE_SEED_MAX = 1_000_000
+
+def style_rng(seed=None):
+    """조립용 난수 생성기 - 시드가 없으면 전역 random 모듈 그대로 (random.seed 기준 결과가 예전과 같음)
+    시드를 주면 전용 생성기 → 같은 시드면 소제목 스타일/구분선/CTA 문구가 항상 같게 나옴"""
+    return random if seed is None else random.Random(seed)
+
+def style_seed(seed=None):
+    """재현용 스타일 시드 (없으면 전역 random에서 새로 뽑음) - 스타일 다시 뽑기/섹션 다시 쓰기에서 사용"""
+    return random.randrange(STYLE_SEED_MAX) if seed is None else seed
+
+def get_ftc_text(url):
+    """공정위 문구"""
+    if not url: return ""
+    u = url.lower()
+    if "coupang" in u: return "이 포스팅은 쿠팡 파트너스 활동의 일환으로, 이에 따른 일정액의 수수료를 제공받습니다."
+    if "naver" in u or "smartstore" in u: return "이 포스팅은 네이버 쇼핑커넥트 활동의 일환으로, 판매 발생 시 수수료를 제공받습니다."
+    if "oliveyoung" in u: return "이 포스팅은 올리브영 쇼핑 큐레이터 활동의 일환으로, 판매 발생시 수수료를 제공받습니다."
+    return "이 포스팅은 제휴 마케팅 활동의 일환으로 커미션를 받습니다."
+
+UNSPLASH_SEARCH_URL = "https://api.unsplash.com/search/photos"
+UNSPLASH_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "unsplash")
+UNSPLASH_CACHE_TTL = int(os.getenv("UNSPLASH_CACHE_TTL") or 86400)   # 초
+UNSPLASH_QUOTA_RESERVE = int(os.getenv("UNSPLASH_QUOTA_RESERVE") or 5)  # 남은 호출이 이 이하면 캐시 우선
+
+def _create_http_session():
+    """커넥션 풀을 재사용하는 HTTP 세션"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+class DiskCache:
+    """JSON 파일 기반 디스크 캐시 (만료 후에도 stale 조회 가능)"""
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + ".json")
+
+    def get(self, key):
+        """(값, 신선 여부) 반환. 없으면 (None, False)"""
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                item = json.load(f)
+        except (OSError, ValueError):
+            return None, False
+        return item['value'], time.time() - item['saved_at'] < self.ttl
+
+    def set(self, key, value):
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'saved_at': time.time(), 'value': value}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+class UnsplashQuota:
+    """Unsplash 시간당 호출 한도 추적 (X-Ratelimit-* 헤더)"""
+    WINDOW = 3600
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.updated_at = 0.0
+        self._lock = threading.Lock()
+
+    def update(self, headers):
+        try:
+            limit = int(headers.get('X-Ratelimit-Limit'))
+            remaining = int(headers.get('X-Ratelimit-Remaining'))
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self.limit, self.remaining, self.updated_at = limit, remaining, time.time()
+
+    def near_limit(self, reserve=UNSPLASH_QUOTA_RESERVE):
+        with self._lock:
+            if self.remaining is None or time.time() - self.updated_at > self.WINDOW:
+                return False  # 정보 없음 또는 한도 리셋
+            return self.remaining <= reserve
+
+# 프로세스 공용 HTTP 세션 / Unsplash 캐시 / 한도 추적
+http_session = _create_http_session()
+unsplash_cache = DiskCache(UNSPLASH_CACHE_DIR, UNSPLASH_CACHE_TTL)
+unsplash_quota = UnsplashQuota()
+
+def warm_connections():
+    """첫 요청 지연을 줄이기 위해 Gemini/Unsplash TLS 연결 수립 + 모드별 규칙 캐시 등록 (실패는 무시)"""
+    try:
+        genai.get_model(f"models/{config['model_name']}")
+    except Exception:
+        pass
+    for mode in SYSTEM_INSTRUCTIONS:
+        try:
+            mode_models.get(mode)
+        except Exception:
+            pass
+    if config['unsplash_key']:
+        try:
+            http_session.head("https://api.unsplash.com/", timeout=5)
+        except Exception:
+            pass
+
+def fetch_unsplash_images(keyword, count=5):
+    """Unsplash에서 이미지 검색 (디스크 캐시 + 한도 임박 시 stale 캐시 사용)
+    st 호출 없이 (이미지 목록, 알림 레벨, 알림 문구) 반환 - 작업 스레드에서 호출 가능
+    다른 세션이 같은 검색을 진행 중이면 그 결과를 공유"""
+    if not config['unsplash_key']:
+        return [], "warning", "⚠️ UNSPLASH_ACCESS_KEY가 .env 파일에 없습니다. 이미지를 추가하려면 API 키를 설정하세요."
+    cache_key = f"{normalize_keyword(keyword)}|{count}"
+    return image_flight.do(cache_key, _fetch_unsplash_images, cache_key, keyword, count)
+
+def _fetch_unsplash_images(cache_key, keyword, count):
+    cache = unsplash_cache
+    quota = unsplash_quota
+    cached, fresh = cache.get(cache_key)
+    if fresh:
+        return cached, "success", f"✅ Unsplash 이미지 {len(cached)}장 (캐시)"
+    if cached is not None and quota.near_limit():
+        return cached, "info", f"⏳ Unsplash 호출 한도 임박 ({quota.remaining}회 남음) - 이전 이미지 {len(cached)}장 사용"
+
+    try:
+        params = {"query": keyword, "per_page": count, "client_id": config['unsplash_key']}
+        response = http_session.get(UNSPLASH_SEARCH_URL, params=params, timeout=10)
+        quota.update(response.headers)
+        
+        if response.status_code != 200:
+            if cached is not None:
+                return cached, "info", f"⏳ Unsplash API 오류({response.status_code}) - 이전 이미지 {len(cached)}장 사용"
+            return [], "error", f"❌ Unsplash API 오류: {response.status_code} - {response.text[:100]}"
+            
+        data = response.json()
+        images = []
+        for photo in data.get('results', []):
+            images.append({
+                'url': photo['urls']['regular'],
+                'photographer': photo['user']['name'],
+                'photo_link': photo['links']['html']
+            })
+        cache.set(cache_key, images)
+        
+        if not images:
+            return images, "info", f"💡 '{keyword}' 키워드로 이미지를 찾지 못했습니다."
+        return images, "success", f"✅ Unsplash에서 이미지 {len(images)}장 찾음!"
+    except Exception as e:
+        if cached is not None:
+            return cached, "info", f"⏳ Unsplash 연결 실패 - 이전 이미지 {len(cached)}장 사용"
+        return [], "error", f"❌ Unsplash 이미지 오류: {e}"
+
+@contextmanager
+def timed(timings, name):
+    """with 블록 소요 시간(초)을 timings[name]에 기록하고 성능 계측에 반영"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        timings[name] = round(elapsed, 3)
+        metrics.observe(name, elapsed)
+
+def run_stages(stages, status=None, on_tick=None, tick_interval=0.3, timings=None):
+    """단계 그래프 실행 - 의존성 없는 단계는 스레드 풀에서 동시에 실행
+    stages: {이름: (함수, [의존 단계 이름], 라벨)}
+    함수는 의존 단계 결과를 같은 이름의 키워드 인자로 받음. {이름: 결과} 반환
+    status: write(문구)를 가진 진행 표시 객체 (st.status 등)
+    on_tick: 대기 중 tick_interval마다 호출 (스트리밍 미리보기 갱신용)
+    timings: 주어지면 단계별 소요 시간(초)을 기록하고 성능 계측에 반영
+    단계 함수는 호출 측 컨텍스트(계측 라벨 등)를 복사해 실행"""
+    for name, (_, deps, _) in stages.items():
+        missing = [d for d in deps if d not in stages]
+        if missing:
+            raise ValueError(f"'{name}' 단계의 의존 단계가 없습니다: {missing}")
+
+    results = {}
+    pending = dict(stages)
+    running = {}
+    with ThreadPoolExecutor(max_workers=len(stages)) as pool:
+        while pending or running:
+            for name, (func, deps, label) in list(pending.items()):
+                if all(d in results for d in deps):
+                    future = pool.submit(contextvars.copy_context().run, func, **{d: results[d] for d in deps})
+                    running[future] = (name, time.perf_counter())
+                    del pending[name]
+                    if status:
+                        status.write(f"⏳ {label}...")
+            done, _ = wait(running, timeout=tick_interval if on_tick else None,
+                           return_when=FIRST_COMPLETED)
+            if on_tick:
+                on_tick()
+            for future in done:
+                name, started = running.pop(future)
+                results[name] = future.result()
+                elapsed = time.perf_counter() - started
+                if timings is not None:
+                    timings[name] = round(elapsed, 3)
+                    metrics.observe(name, elapsed)
+                if status:
+                    status.write(f"✅ {stages[name][2]} ({elapsed:.1f}초)")
+    return results
+
+def format_image_html(img):
+    """이미지 HTML 생성 (출처 포함)"""
+    return f'''<div style="margin:30px 0; text-align:center;">
+<img src="{img['url']}" alt="관련 이미지" style="max-width:100%; border-radius:8px; box-shadow:0 4px 8px rgba(0,0,0,0.1);">
+<p style="font-size:12px; color:#666; margin-top:8px;">
+Photo by <a href="{img['photo_link']}" target="_blank" style="color:#666; text-decoration:underline;">{img['photographer']}</a> on <a href="https://unsplash.com" target="_blank" style="color:#666; text-decoration:underline;">Unsplash</a>
+</p></div>'''
+
+# ==========================================
+# 3. 원고 생성 (Gemini)
+# ==========================================
+
+class ContentStreamExtractor:
+    """아직 닫히지 않은 JSON 응답에서 "content" 문자열 값을 점진적으로 추출"""
+    _SPECIAL = re.compile(r'["\\]')
+    _ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', '"': '"', '\\': '\\', '/': '/'}
+
+    def __init__(self, field='content'):
+        self._key = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self.raw = ""
+        self.content = ""
+        self.done = False
+        self._pos = None   # 값 내부에서 다음에 읽을 위치
+
+    def feed(self, chunk):
+        """청크 추가 후 지금까지 디코딩된 content 반환"""
+        self.raw += chunk
+        if self.done:
+            return self.content
+        if self._pos is None:
+            match = self._key.search(self.raw)
+            if not match:
+                return self.content
+            self._pos = match.end()
+
+        raw, i, n = self.raw, self._pos, len(self.raw)
+        parts = []
+        while i < n:
+            c = raw[i]
+            if c == '"':
+                self.done = True
+                i += 1
+                break
+            if c == '\\':
+                if i + 1 >= n:
+                    break   # 이스케이프가 다음 청크에 이어짐
+                e = raw[i + 1]
+                if e == 'u':
+                    if i + 6 > n:
+                        break
+                    try:
+                        code = int(raw[i + 2:i + 6], 16)
+                    except ValueError:
+                        parts.append(raw[i:i + 6])
+                        i += 6
+                        continue
+                    if 0xD800 <= code < 0xDC00:
+                        # 서로게이트 쌍 (\uD83D\uDE00 등) - 뒤쪽 절반까지 받은 뒤 결합
+                        if i + 12 > n:
+                            break
+                        if raw[i + 6:i + 8] == '\\u':
+                            try:
+                                low = int(raw[i + 8:i + 12], 16)
+                            except ValueError:
+                                low = 0
+                            if 0xDC00 <= low < 0xE000:
+                                parts.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                                i += 12
+                                continue
+                    parts.append('\ufffd' if 0xD800 <= code < 0xE000 else chr(code))
+                    i += 6
+                else:
+                    parts.append(self._ESCAPES.get(e, e))
+                    i += 2
+                continue
+            match = self._SPECIAL.search(raw, i)
+            j = match.start() if match else n
+            parts.append(raw[i:j])
+            i = j
+        self._pos = i
+        self.content += "".join(parts)
+        return self.content
+
+def _string_schema(fields):
+    """문자열 필드만 있는 응답 스키마"""
+    return {
+        "type": "object",
+        "properties": {field: {"type": "string"} for field in fields},
+        "required": list(fields),
+    }
+
+ARTICLE_FIELDS = ('title', 'content', 'hashtags')
+ARTICLE_SCHEMA = _string_schema(ARTICLE_FIELDS)
+SECTION_SCHEMA = _string_schema(('content',))   # 섹션 다시 쓰기 응답 {"content"}
+
+def json_mode_config(schema=ARTICLE_SCHEMA):
+    """자유 형식 응답을 복구하지 못했을 때 재요청에 쓰는 네이티브 JSON 모드 (schema: 요청마다 기대하는 응답 형식)"""
+    return {"response_mime_type": "application/json", "response_schema": schema}
+
+class LLMJSONError(ValueError):
+    """LLM 응답에서 원고 JSON을 추출/복구하지 못함"""
+
+class LLMTruncatedError(LLMJSONError):
+    """응답이 중간에 끊김 (닫히지 않은 문자열/괄호) - 복구하면 미완성 원고가 완성본처럼 보이므로 다시 요청"""
+
+# 모드별 고정 규칙 (각 모드 섹션에서 등록) - 요청 프롬프트에는 키워드/정보/페르소나 등 가변 부분만 포함
+SYSTEM_INSTRUCTIONS = {}
+CONTEXT_CACHE_ENABLED = (os.getenv("GEMINI_CONTEXT_CACHE") or "1") != "0"
+CONTEXT_CACHE_TTL = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL") or 3600)   # 초
+CONTEXT_CACHE_REFRESH_MARGIN = 120   # 만료 이만큼 전에 새로 등록 (초)
+
+class ModeModelCache:
+    """모드별 고정 규칙 모델 (프로세스 공용, 모드당 1회 생성)
+    Gemini 컨텍스트 캐시(CachedContent)에 규칙을 등록해 요청마다 다시 보내지 않고,
+    캐시를 만들 수 없으면(최소 토큰 미달/미지원 모델/권한) system_instruction 모델로 대체
+    캐시 등록(네트워크 호출)은 공용 잠금 밖에서 모드별로 1번만 실행 - 같은 모드를 찾는 호출만 기다림"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._models = {}        # 모드 → (모델, 캐시 만료 시각 또는 None)
+        self._uncached = set()   # 캐시 등록에 실패한 모드 (다시 시도하지 않음)
+        self._generation = 0     # clear()마다 증가 - 그 전에 시작한 생성 결과는 저장하지 않음
+
+    def _fresh(self, mode):
+        """유효한 모델 (없거나 캐시 만료가 가까우면 None) - self._lock 안에서 호출"""
+        entry = self._models.get(mode)
+        if entry and (entry[1] is None or entry[1] - CONTEXT_CACHE_REFRESH_MARGIN > time.time()):
+            return entry[0]
+        return None
+
+    def get(self, mode):
+        with self._lock:
+            model = self._fresh(mode)
+        return model if model is not None else self._flight.do(mode, self._refresh, mode)
+
+    def _refresh(self, mode):
+        with self._lock:
+            model = self._fresh(mode)   # 앞선 생성이 방금 끝났으면 그 결과 사용
+            if model is not None:
+                return model
+            generation = self._generation
+            use_cache = CONTEXT_CACHE_ENABLED and mode not in self._uncached
+        entry = self._build(mode, use_cache)
+        with self._lock:
+            if entry[1] is None and use_cache:
+                self._uncached.add(mode)
+            if generation == self._generation:
+                self._models[mode] = entry
+        return entry[0]
+
+    def _build(self, mode, use_cache):
+        instruction = SYSTEM_INSTRUCTIONS[mode]
+        if use_cache:
+            try:
+                cached = genai.caching.CachedContent.create(
+                    model=f"models/{config['model_name']}", display_name=f"ghost-{mode}",
+                    system_instruction=instruction, ttl=datetime.timedelta(seconds=CONTEXT_CACHE_TTL))
+                return genai.GenerativeModel.from_cached_content(cached), time.time() + CONTEXT_CACHE_TTL
+            except Exception as e:
+                print(f"컨텍스트 캐시 사용 불가 ({mode}) - system instruction으로 대체: {e}", file=sys.stderr)
+        return genai.GenerativeModel(config['model_name'], system_instruction=instruction), None
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._models.clear()
+            self._uncached.clear()
+
+mode_models = ModeModelCache()
+
+# 모드별 생성 설정 - max_output_tokens는 목표 글자 수 × 학습한 토큰/글자 비율로 요청마다 계산
+# temperature/top_p가 None이면 모델 기본값 (Gemini 3은 기본값 1.0 유지 권장)
+# GEMINI_GENERATION='{"naver_profit": {"temperature": 0.9, "stop_sequences": ["[끝]"]}}' 처럼 모드별로 덮어씀
+GENERATION_KEYS = ('temperature', 'top_p', 'top_k', 'stop_sequences')
+GENERATION_SETTINGS = {
+    'naver_profit': {'temperature': None, 'top_p': None, 'stop_sequences': [], 'target_chars': None},
+    'naver_info': {'temperature': None, 'top_p': None, 'stop_sequences': [], 'target_chars': None},
+    'tistory_info': {'temperature': None, 'top_p': None, 'stop_sequences': [], 'target_chars': None},
+    'tistory_profit': {'temperature': None, 'top_p': None, 'stop_sequences': [], 'target_chars': None},
+}
+for _mode, _overrides in json.loads(os.getenv("GEMINI_GENERATION") or "{}").items():
+    GENERATION_SETTINGS.setdefault(_mode, {}).update(_overrides)
+
+GEMINI_TOKENS_PER_CHAR = float(os.getenv("GEMINI_TOKENS_PER_CHAR") or 2.0)       # 학습 전 비율 (사고 토큰 포함, 넉넉하게)
+GEMINI_MAX_OUTPUT_TOKENS = int(os.getenv("GEMINI_MAX_OUTPUT_TOKENS") or 16384)   # 출력 토큰 상한
+TOKEN_HEADROOM = 1.3          # 예상 토큰에 더하는 여유 비율
+RESPONSE_EXTRA_CHARS = 300    # 본문 외 응답 글자 수 (제목/해시태그/JSON 키)
+TOKEN_RATIO_SMOOTHING = 0.2   # 비율 이동 평균 가중치
+TRUNCATION_BOOST = 1.5        # 출력 한도에서 잘린 응답이면 비율을 이만큼 키움
+TOKEN_RATIO_RANGE = (0.2, 10.0)
+
+class TokenBudget:
+    """모드별 출력 토큰/글자 비율 학습 (프로세스 공용, 스레드 안전)
+    응답마다 (출력 토큰 수 ÷ 태그 뺀 응답 글자 수)를 이동 평균하고, 잘린 응답이면 비율을 키움"""
+    def __init__(self, initial=GEMINI_TOKENS_PER_CHAR, smoothing=TOKEN_RATIO_SMOOTHING):
+        self.initial = initial
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._ratios = {}   # 모드 → 비율
+        self._samples = {}  # 모드 → 관측 수
+
+    def ratio(self, mode):
+        with self._lock:
+            return self._ratios.get(mode, self.initial)
+
+    def observe(self, mode, tokens, text, truncated=False):
+        """응답 1건 반영 (tokens: 출력 토큰 수 - 사고 토큰 포함, text: 응답 원문)"""
+        chars = len(TAG_PATTERN.sub('', text))
+        low, high = TOKEN_RATIO_RANGE
+        if tokens <= 0 or chars <= 0:
+            if truncated:   # 사고 토큰만으로 한도를 다 씀 - 잴 글자가 없으니 현재 비율만 키움
+                with self._lock:
+                    self._ratios[mode] = min(high, self._ratios.get(mode, self.initial) * TRUNCATION_BOOST)
+                    self._samples[mode] = self._samples.get(mode, 0) + 1
+            return
+        with self._lock:
+            ratio = tokens / chars
+            if mode not in self._ratios:
+                current = ratio
+            else:
+                current = (1 - self.smoothing) * self._ratios[mode] + self.smoothing * ratio
+            if truncated:
+                current = max(current, ratio) * TRUNCATION_BOOST
+            self._ratios[mode] = min(high, max(low, current))
+            self._samples[mode] = self._samples.get(mode, 0) + 1
+
+    def max_tokens(self, mode, target_chars):
+        """목표 글자 수 → max_output_tokens"""
+        tokens = (target_chars + RESPONSE_EXTRA_CHARS) * self.ratio(mode) * TOKEN_HEADROOM
+        return min(GEMINI_MAX_OUTPUT_TOKENS, int(tokens) + 1)
+
+    def snapshot(self):
+        """{모드: (비율, 관측 수)} - 아직 관측이 없는 모드는 제외"""
+        with self._lock:
+            return {mode: (ratio, self._samples[mode]) for mode, ratio in self._ratios.items()}
+
+token_budget = TokenBudget()
+
+def mode_target_chars(mode):
+    """모드의 목표 본문 글자 수 (설정값, 없으면 검수 규칙의 최대 글자 수 + 허용 오차)
+    'N자 이상'처럼 상한이 없는 규칙이면 None - 길이를 임의로 잡아 자르지 않음"""
+    target = GENERATION_SETTINGS.get(mode, {}).get('target_chars')
+    if target:
+        return target
+    high = CONTENT_RULES[mode].length[1]
+    return round(high * (1 + LENGTH_SLACK)) if high else None
+
+def mode_max_tokens(mode, target_chars=None):
+    """이번 요청의 max_output_tokens (목표 글자 수가 없으면 출력 토큰 상한)"""
+    target = target_chars or mode_target_chars(mode)
+    return token_budget.max_tokens(mode, target) if target else GEMINI_MAX_OUTPUT_TOKENS
+
+def mode_generation_config(mode, target_chars=None, base=None):
+    """모드별 generation_config (target_chars: 이번 요청의 목표 본문 글자 수, base: JSON 모드 등 추가 설정)"""
+    settings = GENERATION_SETTINGS.get(mode, {})
+    generation_config = {key: settings[key] for key in GENERATION_KEYS if settings.get(key) not in (None, [])}
+    generation_config['max_output_tokens'] = mode_max_tokens(mode, target_chars)
+    generation_config.update(base or {})
+    return generation_config
+
+def _response_usage(response):
+    """응답의 (출력 토큰 수 - 사고 토큰 포함, 출력 한도에서 잘렸는지). 정보가 없으면 (0, False)"""
+    usage = getattr(response, 'usage_metadata', None)
+    tokens = usage.total_token_count - usage.prompt_token_count if usage else 0
+    candidates = getattr(response, 'candidates', None) or []
+    truncated = bool(candidates) and getattr(candidates[0].finish_reason, 'name', '') == 'MAX_TOKENS'
+    return tokens, truncated
+
+def _response_text(response):
+    """응답 텍스트. 사고 토큰만 쓰고 잘려 텍스트가 없으면 '' (나머지 ValueError는 그대로)"""
+    try:
+        return response.text
+    except ValueError:
+        if _response_usage(response)[1]:
+            return ''
+        raise
+
+def _finish_response(mode, response, text):
+    """응답 1건 마무리 - 비율 학습 후, 출력 한도에서 잘렸으면 LLMTruncatedError
+    (재시도 가능 오류라 요청 계층이 다시 보내고, 그때는 키운 비율로 한도를 다시 계산)"""
+    tokens, truncated = _response_usage(response)
+    if mode:
+        token_budget.observe(mode, tokens, text, truncated)
+    if truncated:
+        raise LLMTruncatedError(f"응답이 출력 한도에서 끊겼습니다 ({len(text)}자, 출력 {tokens}토큰).")
+
+# Gemini 요청 계층 - 시도별 마감, 지터 지수 백오프, (선택) 헤지 요청
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT") or 90)              # 시도별 마감 (초)
+GEMINI_MAX_ATTEMPTS = int(os.getenv("GEMINI_MAX_ATTEMPTS") or 3)
+GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE") or 1.0)
+GEMINI_BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX") or 20.0)
+GEMINI_HEDGE_DELAY = float(os.getenv("GEMINI_HEDGE_DELAY") or 0)       # 0이면 헤지 요청 안 함
+GEMINI_POLL_INTERVAL = 0.1   # 대기 중 진행 상황 전달 간격 (초)
+
+RETRYABLE_ERRORS = (
+    TimeoutError, ConnectionError, requests.exceptions.ConnectionError, requests.exceptions.Timeout, LLMTruncatedError,
+    google_errors.DeadlineExceeded, google_errors.ServiceUnavailable, google_errors.ResourceExhausted,
+    google_errors.InternalServerError, google_errors.BadGateway, google_errors.GatewayTimeout, google_errors.Aborted,
+)
+
+# 백오프 지터는 전역 random(페르소나/스타일 선택)과 분리
+_retry_rng = random.Random()
+
+class GeminiRequestError(RuntimeError):
+    """재시도 후에도 Gemini 요청 실패 (마지막 오류는 __cause__)"""
+
+def backoff_delay(attempt):
+    """full jitter 지수 백오프 (초)"""
+    return _retry_rng.uniform(0, min(GEMINI_BACKOFF_MAX, GEMINI_BACKOFF_BASE * 2 ** attempt))
+
+def _start_attempt(func, *args):
+    """시도 1건을 데몬 스레드로 실행 (마감을 넘겨 버려진 호출이 종료를 막지 않도록)"""
+    future = Future()
+    context = contextvars.copy_context()
+
+    def run():
+        try:
+            future.set_result(context.run(func, *args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="ghost-gemini", daemon=True).start()
+    return future
+
+def _start_admitted(func, *args):
+    """입장 허가를 받은 시도 시작 - 시도가 끝나면(마감 후 버려져도 실제 호출이 끝날 때) 자리 반납"""
+    started = time.monotonic()
+    future = _start_attempt(func, *args)
+    future.add_done_callback(lambda _: admission.release(time.monotonic() - started))
+    return future
+
+def _throttle_on_quota(error, attempt_no):
+    """429(ResourceExhausted)면 모든 세션의 새 호출을 백오프 시간만큼 멈춤"""
+    if isinstance(error, google_errors.ResourceExhausted):
+        admission.pause(min(GEMINI_BACKOFF_MAX, GEMINI_BACKOFF_BASE * 2 ** attempt_no))
+
+def request_with_hedging(attempt, on_progress=None, timeout=None, hedge_delay=None, max_attempts=None):
+    """Gemini 요청 계층 (동기)
+    attempt(report, cancel): 1회 요청 + 파싱. report는 진행 콜백(주 요청만, 헤지는 None), cancel은 중단 신호
+    - 시도마다 timeout초 마감, 재시도 가능한 오류/마감 초과면 지터 백오프 후 재시도
+    - hedge_delay초 안에 끝나지 않으면 같은 요청을 하나 더 보내 먼저 성공(파싱 가능)한 쪽을 사용하고 나머지는 중단
+    - on_progress는 호출한 스레드에서만 호출 (Streamlit 미리보기용)
+    - 시도마다 입장 제어(속도 제한/동시 호출 상한/세션별 공정 대기열)를 거치고, 마감은 입장 후부터 계산
+      헤지 요청은 대기 없이 바로 입장할 수 있을 때만 보냄"""
+    timeout = GEMINI_TIMEOUT if timeout is None else timeout
+    hedge_delay = GEMINI_HEDGE_DELAY if hedge_delay is None else hedge_delay
+    max_attempts = GEMINI_MAX_ATTEMPTS if max_attempts is None else max_attempts
+    progress = [None, 0]   # [추출기, 갱신 횟수] - 작업 스레드가 갱신, 호출 스레드가 전달
+
+    def report(extractor):
+        progress[0] = extractor
+        progress[1] += 1
+
+    last_error = None
+    for attempt_no in range(max_attempts):
+        if attempt_no:
+            time.sleep(backoff_delay(attempt_no - 1))
+        cancel = threading.Event()
+        metrics.observe('gemini_queue', admission.acquire())
+        started = time.monotonic()
+        pending = {_start_admitted(attempt, report if on_progress else None, cancel)}
+        hedged = hedge_delay <= 0
+        last_error = None
+        reported = progress[1]
+        while pending:
+            now = time.monotonic()
+            wake = started + timeout if hedged else min(started + timeout, started + hedge_delay)
+            done, pending = wait(pending, timeout=min(GEMINI_POLL_INTERVAL, max(0, wake - now)),
+                                 return_when=FIRST_COMPLETED)
+            if on_progress and progress[1] != reported:
+                reported = progress[1]
+                on_progress(progress[0])
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                cancel.set()   # 늦은 쪽은 중단 (스트리밍은 다음 청크에서 멈춤, 나머지는 결과 무시)
+                return result
+            now = time.monotonic()
+            if pending and not hedged and now >= started + hedge_delay:
+                hedged = True
+                if admission.try_acquire():
+                    pending.add(_start_admitted(attempt, None, cancel))
+            if pending and now >= started + timeout:
+                cancel.set()
+                last_error = TimeoutError(f"Gemini 응답이 {timeout:g}초 안에 오지 않았습니다.")
+                break
+        if not isinstance(last_error, RETRYABLE_ERRORS):
+            raise last_error   # 형식 오류(LLMJSONError)는 호출 측(JSON 모드 재요청)에서 처리, 잘린 응답은 재시도
+        _throttle_on_quota(last_error, attempt_no)
+        if attempt_no + 1 < max_attempts:
+            print(f"Gemini 요청 재시도 ({attempt_no + 1}/{max_attempts - 1}): {last_error}", file=sys.stderr)
+    raise GeminiRequestError(f"Gemini 요청이 {max_attempts}회 모두 실패했습니다: {last_error}") from last_error
+
+def generate_text(prompt, stream=False, on_progress=None, generation_config=None, timeout=None, cancel=None,
+                  mode=None, target_chars=None):
+    """Gemini 원고 생성 1회 호출. stream=True면 청크마다 on_progress(extractor) 호출 후 전체 응답 반환
+    cancel(threading.Event)이 설정되면 스트리밍을 중단, mode를 주면 그 모드의 고정 규칙 모델과 생성 설정 사용
+    (target_chars: 목표 본문 글자 수 - 출력 토큰 한도 계산용, 없으면 모드 기본값)"""
+    request_options = {'timeout': timeout} if timeout else None
+    model = get_model(mode)
+    if mode:
+        generation_config = mode_generation_config(mode, target_chars, generation_config)
+    with metrics.timer('gemini_call'):
+        if not stream:
+            response = model.generate_content(prompt, generation_config=generation_config,
+                                              request_options=request_options)
+            text = _response_text(response)
+            _finish_response(mode, response, text)
+            return text
+        extractor = ContentStreamExtractor()
+        response = model.generate_content(prompt, stream=True, generation_config=generation_config,
+                                          request_options=request_options)
+        for chunk in response:
+            if cancel is not None and cancel.is_set():
+                return extractor.raw   # 다른 요청이 이김 - 결과는 버려짐 (비율 학습에서도 제외)
+            try:
+                text = chunk.text
+            except ValueError:
+                continue   # 텍스트 없는 청크 (안전 필터 메타데이터 등)
+            extractor.feed(text)
+            if on_progress:
+                on_progress(extractor)
+        _finish_response(mode, response, extractor.raw)
+        return extractor.raw
+
+def extract_json_object(text):
+    """문자열/이스케이프를 고려해 괄호 균형으로 첫 JSON 객체 추출
+    (후보 문자열, 닫힘 여부) 반환. '{'가 없으면 (None, False)"""
+    start = text.find('{')
+    if start < 0:
+        return None, False
+    depth, in_string, escape = 0, False, False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif c == '\\':
+                escape = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1], True
+    return text[start:], False
+
+_CONTROL_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t'}
+_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+
+def _closes_string(text, i):
+    """text[i]의 따옴표 뒤가 구분자(, } ] :)나 끝이면 문자열 종료로 판단"""
+    j = i + 1
+    while j < len(text) and text[j] in ' \t\r\n':
+        j += 1
+    return j >= len(text) or text[j] in ',}]:'
+
+def repair_json(candidate):
+    """흔한 LLM JSON 결함 복구: 문자열 내 날 줄바꿈/탭, 이스케이프 안 된 따옴표,
+    끝부분 쉼표, 잘린 문자열/괄호 → (복구한 문자열, 잘림 여부 - 열린 문자열/괄호를 닫아야 했으면 True)"""
+    out = []
+    stack = []
+    in_string, escape = False, False
+    for i, c in enumerate(candidate):
+        if in_string:
+            if escape:
+                escape = False
+                out.append(c)
+            elif c == '\\':
+                escape = True
+                out.append(c)
+            elif c == '"':
+                if _closes_string(candidate, i):
+                    in_string = False
+                    out.append(c)
+                else:
+                    out.append('\\"')
+            else:
+                out.append(_CONTROL_ESCAPES.get(c, c))
+        else:
+            if c == '"':
+                in_string = True
+            elif c in '{[':
+                stack.append('}' if c == '{' else ']')
+            elif c in '}]' and stack:
+                stack.pop()
+                if not stack:
+                    out.append(c)
+                    break   # 최상위 객체 끝 - 뒤따르는 설명 문장은 버림
+            out.append(c)
+    if escape:
+        out.pop()   # 잘린 이스케이프 제거
+    truncated = in_string or bool(stack)
+    if in_string:
+        out.append('"')
+    repaired = "".join(out).rstrip().rstrip(',')
+    repaired += "".join(reversed(stack))
+    return _TRAILING_COMMA.sub(r'\1', repaired), truncated
+
+def _salvage_fields(text):
+    """최후 수단: 알려진 키(title/content/hashtags) 위치로 값 범위를 잘라 복원"""
+    found = []
+    for field in ARTICLE_FIELDS:
+        match = re.search(r'"%s"\s*:\s*"' % field, text)
+        if match:
+            found.append((match.start(), match.end(), field))
+    found.sort()
+    data = {}
+    for n, (_, value_start, field) in enumerate(found):
+        end = found[n + 1][0] if n + 1 < len(found) else len(text)
+        segment = text[value_start:end].rstrip()
+        segment = segment.rstrip('}').rstrip().rstrip(',').rstrip()
+        if segment.endswith('"') and not segment.endswith('\\"'):
+            segment = segment[:-1]
+        try:
+            data[field] = json.loads(repair_json('"' + segment + '"')[0])
+        except ValueError:
+            data[field] = segment
+    return data
+
+def _validate(data):
+    if not isinstance(data, dict) or not isinstance(data.get('content'), str) or not data['content'].strip():
+        raise LLMJSONError("JSON에 본문(content)이 없습니다.")
+    return data
+
+def parse_llm_json(raw_text):
+    """LLM 응답에서 원고 JSON 추출 (엄격 파싱 → 결함 복구 → 키 기반 복원 순)
+    응답이 중간에 끊겼으면(복구 중 열린 문자열/괄호를 닫아야 했으면) LLMTruncatedError"""
+    candidate, _ = extract_json_object(raw_text or "")
+    if candidate is None:
+        raise LLMJSONError("JSON 형식을 찾을 수 없습니다.")
+    try:
+        return _validate(json.loads(candidate, strict=False))
+    except ValueError:
+        pass
+    repaired, truncated = repair_json(candidate)
+    if truncated:
+        raise LLMTruncatedError(f"응답이 중간에 끊겼습니다 ({len(candidate)}자에서 종료).")
+    try:
+        return _validate(json.loads(repaired, strict=False))
+    except ValueError:
+        return _validate(_salvage_fields(candidate))
+
+def generate_article(prompt, stream=False, on_progress=None, mode=None, target_chars=None, schema=ARTICLE_SCHEMA):
+    """원고 생성 + JSON 추출 (요청 계층 경유). 복구 불가 응답이면 JSON 모드(응답 스키마 schema)로 재요청
+    target_chars: 목표 본문 글자 수 (섹션 다시 쓰기 등 - 없으면 모드 기본값)"""
+    def attempt(report, cancel, generation_config=None):
+        raw_text = generate_text(prompt, stream and report is not None, report, generation_config,
+                                 GEMINI_TIMEOUT, cancel, mode, target_chars)
+        return parse_llm_json(raw_text)
+    
+    try:
+        return request_with_hedging(attempt, on_progress)
+    except LLMJSONError:
+        return request_with_hedging(lambda report, cancel: attempt(None, cancel, json_mode_config(schema)))
+
+async def generate_text_async(prompt, generation_config=None, timeout=None, mode=None, target_chars=None):
+    """Gemini 비동기 원고 생성 1회 호출 (mode를 주면 그 모드의 생성 설정 사용, target_chars는 generate_text와 같음)"""
+    request_options = {'timeout': timeout} if timeout else None
+    model = await asyncio.to_thread(get_model, mode) if mode else get_model()
+    if mode:
+        generation_config = mode_generation_config(mode, target_chars, generation_config)
+    with metrics.timer('gemini_call'):
+        response = await model.generate_content_async(prompt, generation_config=generation_config,
+                                                            request_options=request_options)
+    text = _response_text(response)
+    _finish_response(mode, response, text)
+    return text
+
+def _start_admitted_async(attempt):
+    """입장 허가를 받은 비동기 시도 시작 - 태스크가 끝나거나 취소되면 자리 반납"""
+    started = time.monotonic()
+    task = asyncio.ensure_future(attempt())
+    task.add_done_callback(lambda _: admission.release(time.monotonic() - started))
+    return task
+
+async def request_with_hedging_async(attempt, timeout=None, hedge_delay=None, max_attempts=None):
+    """Gemini 요청 계층 (비동기) - request_with_hedging과 같은 규칙(입장 제어 포함), 진 쪽 태스크는 취소
+    attempt(): 1회 요청 + 파싱 코루틴을 만드는 함수"""
+    timeout = GEMINI_TIMEOUT if timeout is None else timeout
+    hedge_delay = GEMINI_HEDGE_DELAY if hedge_delay is None else hedge_delay
+    max_attempts = GEMINI_MAX_ATTEMPTS if max_attempts is None else max_attempts
+    last_error = None
+    for attempt_no in range(max_attempts):
+        if attempt_no:
+            await asyncio.sleep(backoff_delay(attempt_no - 1))
+        loop = asyncio.get_running_loop()
+        metrics.observe('gemini_queue', await admission.acquire_async())
+        started = loop.time()
+        pending = {_start_admitted_async(attempt)}
+        hedged = hedge_delay <= 0
+        last_error = None
+        try:
+            while pending:
+                wake = started + timeout if hedged else min(started + timeout, started + hedge_delay)
+                done, pending = await asyncio.wait(pending, timeout=max(0, wake - loop.time()),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                if pending and not hedged and loop.time() >= started + hedge_delay:
+                    hedged = True
+                    if admission.try_acquire():
+                        pending.add(_start_admitted_async(attempt))
+                if pending and loop.time() >= started + timeout:
+                    last_error = TimeoutError(f"Gemini 응답이 {timeout:g}초 안에 오지 않았습니다.")
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+        if not isinstance(last_error, RETRYABLE_ERRORS):
+            raise last_error
+        _throttle_on_quota(last_error, attempt_no)
+        if attempt_no + 1 < max_attempts:
+            print(f"Gemini 요청 재시도 ({attempt_no + 1}/{max_attempts - 1}): {last_error}", file=sys.stderr)
+    raise GeminiRequestError(f"Gemini 요청이 {max_attempts}회 모두 실패했습니다: {last_error}") from last_error
+
+async def generate_article_async(prompt, mode=None, target_chars=None, schema=ARTICLE_SCHEMA):
+    """원고 생성 + JSON 추출 (비동기, 요청 계층 경유, JSON 모드 재요청 포함)"""
+    async def attempt(generation_config=None):
+        return parse_llm_json(await generate_text_async(prompt, generation_config, GEMINI_TIMEOUT, mode,
+                                                        target_chars))
+    
+    try:
+        return await request_with_hedging_async(attempt)
+    except LLMJSONError:
+        return await request_with_hedging_async(lambda: attempt(json_mode_config(schema)))
+
+def record_article(mode, result, keyword, product='', url=''):
+    """생성 결과를 저장소에 기록하고 result['id'] 설정 (저장 실패는 생성 결과에 영향 없음)"""
+    try:
+        result['id'] = get_store().save(
+            mode, keyword, result['content'], product=product, url=url,
+            persona=result.get('persona', ''), structure=result.get('structure', ''),
+            title=result['title'], raw_json=result.get('data'), timings=result.get('timings'),
+            assembly=result.get('assembly'))
+    except Exception as e:
+        print(f"원고 저장 실패: {e}", file=sys.stderr)
+        result['id'] = None
+    return result
+
+# ==========================================
+# 4. 네이버 수익형
+# ==========================================
+
+NAVER_PROFIT_PERSONAS = [
+    {"role": "30대 워킹맘", "tone": "친근한 존댓말", "keywords": ["진짜", "완전", "대박", "리얼", "솔직히"], "emoji_style": "😊 💕 👍 ✨ 🔥"},
+    {"role": "20대 직장인", "tone": "가벼운 반말", "keywords": ["ㅇㅁ", "가성비", "꿀템", "핵이득", "존맛"], "emoji_style": "🔥 💯 ✅ 💸 ⚡"},
+    {"role": "40대 구매 전문가", "tone": "정중한 존댓말", "keywords": ["실제로", "확실히", "분명", "경험상", "추천드립니다"], "emoji_style": "✅ 💡 📊 👌 ⭐"},
+    {"role": "블로그 마니아", "tone": "설명형 존댓말", "keywords": ["정리해드릴게요", "알려드립니다", "확인해보세요", "참고하세요"], "emoji_style": "📌 ✏️ 💬 🎯 📝"},
+    {"role": "소비 분석가", "tone": "분석적 존댓말", "keywords": ["비교해보면", "데이터상", "실측", "결과적으로"], "emoji_style": "📈 🔍 💰 🎓 ⚖️"}
+]
+
+NAVER_PROFIT_STRUCTURES = {
+    1: {"name": "스토리텔링형", "sections": ["개인 경험담", "문제 발견", "제품 만남", "사용 과정", "결과/변화"]},
+    2: {"name": "데이터 분석형", "sections": ["시장 현황", "수치 비교", "스펙 분석", "가격 분석", "종합 평가"]},
+    3: {"name": "비교 대결형", "sections": ["경쟁 제품들", "1차 비교", "심층 비교", "상황별 추천", "최종 승자"]},
+    4: {"name": "폭로 고발형", "sections": ["충격 사실", "업계 속사정", "진실 분석", "대안 제시", "행동 촉구"]},
+    5: {"name": "Q&A 해결형", "sections": ["베스트 질문", "오해 바로잡기", "핵심 답변", "추가 팁", "최종 정리"]}
+}
+
+CTA_HOOKS = [
+    "🚨 이거 모르고 사면 손해!",
+    "⏰ 지금만 이 가격! 내일부터 인상",
+    "💡 알 사람만 아는 숨겨진 혜택",
+    "🚨 뒤늦게 알고 후회하지 마세요",
+    "⚡ 지금 안 보면 기회 날아갑니다",
+    "🔥 놓치면 후회할 특가!",
+    "✨ 현명한 선택은 지금!",
+    "💝 최저가 타이밍 놓치지 마세요"
+]
+
+DIVIDERS = [
+    "━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+    "────────────────────────────",
+    "◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈◈",
+    "============================================"
+]
+
+def get_naver_h3(text, rng=random):
+    """네이버 19px 소제목 (줄바꿈 확보)"""
+    return f'\n\n{rng.choice(DIVIDERS)}\n<span style="font-size: 19px; font-weight: bold; color: #000000;">📍 {text}</span>\n\n'
+
+SYSTEM_INSTRUCTIONS['naver_profit'] = """
+네이버 블로그 수익형 원고 작성 규칙입니다. [키워드]는 요청의 키워드로 바꿔 쓰세요.
+
+[철칙 - 위반 시 즉시 폐기]
+1. 마크다운(#, *, **) 절대 금지. 오직 <b>태그만!
+2. "안녕하세요", "오늘은", "알아보겠습니다" 금지
+3. 자기소개 절대 금지
+4. 쿠팡 언급 절대 금지
+5. 마무리 멘트 절대 금지 ("결론", "마무리", "마치며")
+6. 날짜 노출 절대 금지
+
+[글자수] 정확히 1800~2400자
+
+[JSON 응답]
+{
+    "title": "제목",
+    "content": "본문",
+    "hashtags": "7개"
+}
+
+[제목 작성법 - 다양한 후킹!]
+반드시 아래 8가지 중 1개 (골고루 사용):
+1. "[키워드] 이거 모르면 손해"
+2. "알 사람만 아는 [키워드] 숨겨진 진실"
+3. "[키워드] 샀다가 멘붕 온 이유"
+4. "업계 10년이 폭로하는 [키워드] 비밀"
+5. "[키워드] vs {경쟁품}, 충격적 결과"
+6. "[키워드] 기대했는데 완전 반전"
+7. "[키워드] 지금 안 보면 후회합니다"
+8. "[키워드] 진실은 이것, 놓치지 마세요"
+
+제목 규칙:
+- [키워드] 반드시 포함
+- 손해/후회/충격/진실/비밀 단어 포함
+- 15-25자
+- 이모지 금지
+
+[절대 금지 - 자기소개!]
+❌ "안녕하세요"
+❌ "저는 ~입니다"
+❌ "40대", "20대", "전문가", "블로거" 단어
+❌ "~로서", "~로써"
+❌ 본인 역할/나이/직업 언급
+→ 바로 본론 시작!
+
+[도입부] 첫 5문장이 생명!
+- 첫 문장 5단어 이내
+- 구체적 숫자 2개+
+- 이모지 1~2개
+- 자기소개 없이 바로 팩트!
+
+[본문 구성]
+요청의 섹션 순서대로 전개
+
+각 섹션:
+- 소제목: [H3]제목[/H3]
+- 이모지 자연스럽게
+
+[CTA 배치]
+[[CTA_1]]을 3번째 섹션 후
+[[CTA_2]]를 FAQ 직전
+총 2번
+
+[FAQ 필수 3개]
+Q1: 가장 큰 실수
+Q2: 꼭 확인할 것
+Q3: 지금 사야 하는 이유
+
+[마무리]
+FAQ 후 2~3문장:
+"지금 안 하면 후회", "{금액}원 날리기 싫으면 지금"
+→ 행동 촉구만! 정리/요약 금지!
+
+[해시태그] 7개 (이모지 없이)
+
+JSON만 출력하세요.
+"""
+
+def generate_naver_profit_prompt(keyword, product, url, facts, persona, structure):
+    """네이버 수익형 프롬프트 (가변 부분만 - 고정 규칙은 SYSTEM_INSTRUCTIONS['naver_profit'])"""
+    return f"""
+당신은 지금 {persona["role"]}입니다.
+
+[작성 정보]
+- 키워드: {keyword}
+- 제품: {product}
+- 링크: {url}
+- 실시간 이슈: {facts}
+- 말투: {persona["tone"]}
+- 이모지: {persona["emoji_style"]}
+
+[본문 구성]
+{", ".join(structure["sections"])}로 전개
+
+JSON만 출력하세요.
+"""
+
+
+def assemble_naver_profit(data, keyword, product, url, seed=None):
+    """원고 JSON → 네이버 수익형 최종 HTML (seed: 스타일/후킹 선택 시드, 없으면 전역 random)"""
+    rng = style_rng(seed)
+    title = data.get('title', f'{keyword} 후기')
+    content = data.get('content', '')
+    
+    # 마크다운 제거
+    content = remove_markdown(content)
+    title = remove_markdown(title)
+    
+    # 소제목 변환 (H3 형식) - CTA 자리는 후킹 문구 선택 후 채움
+    pieces, slots = NAVER_MARKUP.render(content, lambda text: get_naver_h3(text, rng))
+    
+    # CTA 생성 (2개 다른 후킹 + 링크)
+    hook1 = rng.choice(CTA_HOOKS)
+    hook2 = rng.choice([h for h in CTA_HOOKS if h != hook1])
+    
+    cta1_html = f'<div style="margin: 30px 0; padding: 20px; border: 3px solid #000; border-radius: 5px;"><p style="font-size: 15px; color: #000; margin: 0 0 10px 0; font-weight: bold;">{hook1}</p><p style="font-size: 16px; color: #000; margin: 0 0 10px 0; font-weight: bold;">👉 {product} 최저가 & 혜택 확인하기</p><p style="font-size: 14px; margin: 0;"><a href="{url}" target="_blank" style="color: #000; text-decoration: underline;">🔗 {url[:50]}...</a></p></div>'
+    
+    cta2_html = f'<div style="margin: 30px 0; padding: 20px; border: 3px solid #000; border-radius: 5px;"><p style="font-size: 15px; color: #000; margin: 0 0 10px 0; font-weight: bold;">{hook2}</p><p style="font-size: 16px; color: #000; margin: 0 0 10px 0; font-weight: bold;">👉 {product} 지금 바로 구매하기</p><p style="font-size: 14px; margin: 0;"><a href="{url}" target="_blank" style="color: #000; text-decoration: underline;">🔗 {url[:50]}...</a></p></div>'
+    
+    # 첫 [[CTA_1]]/[[CTA_2]]만 치환, 나머지 CTA 마커는 제거
+    ctas = {'1': cta1_html, '2': cta2_html}
+    content = MarkupRenderer.join(pieces, slots, lambda number, nth: ctas.get(number, '') if nth == 0 else '')
+    
+    disclosure = get_ftc_text(url)
+    
+    final = f"""<div style="font-family: 'Nanum Gothic', sans-serif; font-size: 15px; line-height: 1.8; color: #000;">
+{disclosure}
+
+<h1 style="font-size: 24px; font-weight: bold; color: #000; margin: 20px 0; padding-bottom: 10px; border-bottom: 2px solid #000;">{title}</h1>
+
+{content}
+
+<div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; color: #000; font-weight: bold;">{data.get('hashtags', '')}</div>
+</div>"""
+    
+    return {'title': title, 'content': final, 'display': clean_all_tags(final), 'data': data,
+            'assembly': {'keyword': keyword, 'product': product, 'url': url}, 'seed': seed}
+
+def build_naver_profit(keyword, product, url, persona=None, structure=None, stream=False, on_progress=None):
+    """네이버 수익형 원고 생성"""
+    persona = persona or random.choice(NAVER_PROFIT_PERSONAS)
+    structure = structure or NAVER_PROFIT_STRUCTURES[random.randint(1, 5)]
+    
+    timings = {}
+    with metric_labels(mode='naver_profit', persona=persona['role'], structure=structure['name']), timed(timings, 'total'):
+        with timed(timings, 'search'):
+            facts = hunt_realtime_info(keyword)
+        prompt = generate_naver_profit_prompt(keyword, product, url, facts, persona, structure)
+        with timed(timings, 'generate'):
+            data = generate_article(prompt, stream, on_progress, 'naver_profit')
+        with timed(timings, 'validate'):
+            data, validation = validate_article('naver_profit', data, keyword, product)
+        with timed(timings, 'assemble'):
+            result = assemble_naver_profit(data, keyword, product, url)
+    result.update(persona=persona['role'], structure=structure['name'], timings=timings, validation=validation)
+    return record_article('naver_profit', result, keyword, product, url)
+
+# ==========================================
+# 5. 네이버 정보성
+# ==========================================
+
+NAVER_INFO_PERSONAS = [
+    {"role": "전문 칼럼니스트", "tone": "정중한 존댓말", "keywords": ["분석하면", "살펴보면", "알 수 있습니다"]},
+    {"role": "정보 큐레이터", "tone": "친절한 설명", "keywords": ["정리하면", "핵심은", "중요한 점은"]},
+    {"role": "업계 전문가", "tone": "전문적 존댓말", "keywords": ["실제로", "데이터상", "경험상"]}
+]
+
+INFO_TYPES = [
+    "문장형_체크리스트",
+    "표_위주",
+    "단답형_리스트",
+    "박스형_QA강조",
+    "번호목록_속성표"
+]
+
+def get_naver_info_h3(text, rng=random):
+    """네이버 정보성 19px 소제목 (배경색 없음)"""
+    styles = [
+        'border-left: 10px solid #2c5aa0; padding-left: 15px; border-bottom: 1px solid #eee; margin: 40px 0 20px 0;',
+        'border-top: 4px solid #2c5aa0; padding: 15px; border-bottom: 1px solid #eee; margin: 40px 0 20px 0;',
+        'display: inline-block; padding: 5px 15px; border: 2px solid #2c5aa0; color: #2c5aa0; border-radius: 20px; margin: 40px 0 20px 0; font-weight: bold;'
+    ]
+    return f"\n\n<h3 style='font-size:19px; font-weight:bold; color:#111; {rng.choice(styles)}'>{text}</h3>\n\n"
+
+SYSTEM_INSTRUCTIONS['naver_info'] = """
+네이버 블로그 정보성 원고 작성 규칙입니다. [키워드]는 요청의 키워드로 바꿔 쓰세요.
+
+[철칙]
+1. 마크다운(#, *, **) 절대 금지
+2. AI 인사말 금지
+3. 자기소개 금지 ("안녕하세요", "저는", "~입니다" 금지)
+4. 마무리 멘트 금지
+5. 날짜 노출 금지
+6. 배경색 절대 금지! (네이버 깨짐)
+
+[글자수] 정확히 1800~2400자
+
+[제목 - 정보성 후킹!]
+돈 금액 사용 금지! 아래 패턴 사용:
+- "[키워드] 완전 정리 (이것만 알면 끝)"
+- "[키워드] 핵심 총정리"
+- "[키워드] 꼭 알아야 할 모든 것"
+- "[키워드] 처음부터 끝까지"
+- "[키워드] 이것만 보세요"
+예: "건강보험 완전 정리 (이것만 알면 끝)"
+
+[형태별 작성법 - 요청의 형태 1개만 사용]
+- 문장형_체크리스트: ☑️ 항목1입니다. 설명을 2-3문장으로...
+- 표_위주: <table>로 체크리스트와 속성을 정리
+- 단답형_리스트: ✅ 항목1 (1줄로 짧게)
+- 박스형_QA강조: <div> 박스에 체크리스트 + Q&A 5개
+- 번호목록_속성표: 1. 항목1 / 2. 항목2 + <table>속성표</table>
+
+[소제목 형식 - 반드시 준수!]
+모든 소제목은 [H3]제목내용[/H3] 형식으로 작성하세요.
+예: [H3]핵심 체크리스트[/H3]
+    [H3]속성 비교표[/H3]
+
+[키워드 강조]
+[키워드] 단어가 나올 때마다 <b>[키워드]</b>로 강조하세요.
+
+[필수 섹션]
+1. 체크리스트 (형태에 맞게)
+   ⚠️ 배경색 절대 금지!
+   
+2. 속성표 (형태에 맞게)
+   <table style="width:100%; border-collapse:collapse; margin:20px 0;">
+   <tr><th style="border:1px solid #ddd; padding:10px;">항목</th></tr>
+   ⚠️ 배경색 절대 금지!
+   
+3. Q&A 3~5개
+   [H3]자주 듣는 질문[/H3] 다음 줄바꿈 후:
+   
+   <b style="color:#2c5aa0;">Q1. 질문?</b><br>
+   A1. 답변...
+   
+   반드시 소제목 닫은 후 2줄 띄우고 Q1 시작!
+
+[JSON 응답]
+{
+    "title": "강력한 후킹 제목",
+    "content": "본문",
+    "hashtags": "7개"
+}
+
+JSON만 출력하세요.
+"""
+
+def generate_naver_info_prompt(keyword, facts, persona, info_type):
+    """네이버 정보성 프롬프트 (가변 부분만 - 고정 규칙은 SYSTEM_INSTRUCTIONS['naver_info'])"""
+    return f"""
+당신은 {persona["role"]}입니다.
+
+[작성 정보]
+- 키워드: {keyword}
+- 정보: {facts}
+- 말투: {persona["tone"]}
+- 형태: {info_type}
+
+JSON만 출력하세요.
+"""
+
+
+def assemble_naver_info(data, keyword, images, seed=None):
+    """원고 JSON + 이미지 → 네이버 정보성 최종 HTML (seed: 스타일 선택 시드, 없으면 전역 random)"""
+    rng = style_rng(seed)
+    title = data.get('title', f'{keyword} 완전 정리')
+    content = data.get('content', '')
+    
+    # 마크다운 제거
+    content = remove_markdown(content)
+    title = remove_markdown(title)
+    
+    # 소제목 변환 (H3 형식)
+    pieces, _ = H3_MARKUP.render(content, lambda text: get_naver_info_h3(text, rng))
+    content = MarkupRenderer.join(pieces)
+    
+    # Unsplash 이미지 삽입 (5-7장)
+    if images:
+        paragraphs = content.split('</h3>')
+        if len(paragraphs) >= 5:
+            result = []
+            for i, para in enumerate(paragraphs[:-1]):
+                result.append(para)
+                result.append('</h3>')
+                if i < len(images):
+                    result.append(format_image_html(images[i]))
+            result.append(paragraphs[-1])
+            content = ''.join(result)
+    
+    final = f"""<div style="font-family: 'Nanum Gothic', sans-serif; font-size: 15px; line-height: 1.8; color: #000;">
+<h1 style="font-size: 24px; font-weight: bold; color: #000; margin: 20px 0; padding-bottom: 10px; border-bottom: 2px solid #2c5aa0;">{title}</h1>
+
+{content}
+
+<div style="margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; color: #000; font-weight: bold;">{data.get('hashtags', '')}</div>
+</div>"""
+    
+    return {'title': title, 'content': final, 'display': clean_all_tags(final), 'data': data,
+            'assembly': {'keyword': keyword, 'images': images}, 'seed': seed}
+
+def build_naver_info(keyword, persona=None, info_type=None, stream=False, on_progress=None,
+                     status=None, on_tick=None):
+    """네이버 정보성 원고 생성
+    이미지 알림은 result['notice'] = (레벨, 문구)로 반환"""
+    persona = persona or random.choice(NAVER_INFO_PERSONAS)
+    info_type = info_type or random.choice(INFO_TYPES)
+    
+    # 검색 → 생성은 순서대로, 이미지 검색은 동시에 진행
+    # 단계 이름은 다른 모드의 timings 키(search/images/generate)와 동일하게 사용
+    def write(search):
+        prompt = generate_naver_info_prompt(keyword, search, persona, info_type)
+        return generate_article(prompt, stream, on_progress, 'naver_info')
+    
+    timings = {}
+    with metric_labels(mode='naver_info', persona=persona['role'], structure=info_type), timed(timings, 'total'):
+        results = run_stages({
+            'search': (lambda: hunt_realtime_info(keyword), [], "실시간 정보 수집"),
+            'images': (lambda: fetch_unsplash_images(keyword, 7), [], "Unsplash 이미지 검색"),
+            'generate': (write, ['search'], "원고 생성"),
+        }, status, on_tick, timings=timings)
+        images, level, message = results['images']
+        with timed(timings, 'validate'):
+            data, validation = validate_article('naver_info', results['generate'], keyword)
+        with timed(timings, 'assemble'):
+            result = assemble_naver_info(data, keyword, images)
+    result.update(persona=persona['role'], structure=info_type, notice=(level, message), timings=timings,
+                  validation=validation)
+    return record_article('naver_info', result, keyword)
+
+# ==========================================
+# 6. 티스토리 정보성
+# ==========================================
+
+def get_premium_style(rng=random):
+    """p.py 디자인 스킬"""
+    color = "#{:06x}".format(rng.randint(0, 0x777777))
+    styles = [
+        f'border-left: 15px solid {color}; border-bottom: 2px solid {color}; padding: 10px 15px; background: #f8f9fa; font-weight: bold;',
+        f'background: linear-gradient(to right, {color}, white); color: white; padding: 12px 20px; border-radius: 5px; box-shadow: 3px 3px 5px rgba(0,0,0,0.1);',
+        f'border: 2px solid {color}; padding: 15px; border-left: 10px solid {color}; border-radius: 0 10px 10px 0; background: #ffffff;',
+        f'border-top: 1px solid #ddd; border-bottom: 3px double {color}; padding: 10px 0; font-size: 1.5em;'
+    ]
+    return rng.choice(styles)
+
+TISTORY_INFO_PERSONAS = [
+    {"role": "트렌드 분석가", "tone": "세련된 존댓말"},
+    {"role": "콘텐츠 큐레이터", "tone": "친근한 존댓말"},
+    {"role": "정보 전문가", "tone": "전문적 존댓말"}
+]
+
+SYSTEM_INSTRUCTIONS['tistory_info'] = """
+티스토리 정보성 원고 작성 규칙입니다. [키워드]는 요청의 주제로 바꿔 쓰세요.
+
+[절대 규칙 - 매우 중요!]
+1. 🚫 [키워드] 주제에서 절대 벗어나지 마세요
+2. 🚫 관련 없는 경제/투자/전략 이야기 금지
+   예시 금지:
+   - 연예인 은퇴 → 경제/투자 ❌
+   - 건강보험 → 부동산 ❌
+   - 요리 레시피 → 주식 전망 ❌
+3. 🚫 도입부부터 [키워드]만 다루세요
+4. 🚫 억지로 미래 예측 넣지 마세요
+5. 🚫 글자수 채우려고 주제 벗어나지 마세요
+
+[글자수] 정확히 1800~2400자
+
+[제목 - 강력한 후킹!]
+예: "[키워드] 이거 모르면 못 삽니다"
+
+[구조]
+도입: [키워드] 관련 후킹
+본문: 5개 소제목 [H3]제목[/H3]
+- [키워드]와 직접 관련된 내용만
+- <b>태그</b> 강조
+
+[JSON 응답]
+{
+    "title": "강력한 후킹 제목",
+    "content": "본문",
+    "hashtags": "7개"
+}
+
+JSON만 출력하세요.
+"""
+
+def generate_tistory_info_prompt(keyword, facts, persona):
+    """티스토리 정보성 프롬프트 (가변 부분만 - 고정 규칙은 SYSTEM_INSTRUCTIONS['tistory_info'])"""
+    return f"""
+당신은 {keyword}에 대한 {persona["role"]}입니다.
+
+[작성 정보]
+- 주제: {keyword} (이것만!)
+- 정보: {facts}
+- 말투: {persona["tone"]}
+
+JSON만 출력하세요.
+"""
+
+
+def assemble_tistory_info(data, keyword, seed=None):
+    """원고 JSON → 티스토리 정보성 최종 HTML (seed: 스타일 선택 시드, 없으면 전역 random)"""
+    rng = style_rng(seed)
+    title = data.get('title', f'{keyword} 완전 분석')
+    content = data.get('content', '')
+    
+    # 소제목 스타일 적용
+    def replace_h3(text):
+        style = get_premium_style(rng)
+        return f"<br><h3 style='{style}'>{text}</h3>"
+    
+    pieces, _ = H3_MARKUP.render(content, replace_h3)
+    content = MarkupRenderer.join(pieces)
+    
+    final = f"""<div style="font-family: 'Noto Sans KR', sans-serif; font-size: 16px; line-height: 1.8; color: #333; max-width: 800px; margin: auto;">
+<h1 style="font-size: 32px; font-weight: bold; color: #222; margin: 30px 0; text-align: center;">{title}</h1>
+
+<div style="padding: 15px; background: #f1f3f5; border-radius: 8px; margin: 20px 0;">
+<b style="color: #495057;">💡 핵심 요약:</b> {keyword}에 대한 심층 분석
+</div>
+
+{content}
+
+<div style="margin-top: 40px; padding-top: 20px; border-top: 2px solid #dee2e6; color: #6c757d; font-size: 14px;">{data.get('hashtags', '')}</div>
+</div>"""
+    
+    return {'title': title, 'content': final, 'display': clean_all_tags(final), 'data': data,
+            'assembly': {'keyword': keyword}, 'seed': seed}
+
+def build_tistory_info(keyword, persona=None, stream=False, on_progress=None):
+    """티스토리 정보성 원고 생성"""
+    persona = persona or random.choice(TISTORY_INFO_PERSONAS)
+    timings = {}
+    with metric_labels(mode='tistory_info', persona=persona['role']), timed(timings, 'total'):
+        with timed(timings, 'search'):
+            facts = hunt_realtime_info(keyword)
+        prompt = generate_tistory_info_prompt(keyword, facts, persona)
+        with timed(timings, 'generate'):
+            data = generate_article(prompt, stream, on_progress, 'tistory_info')
+        with timed(timings, 'validate'):
+            data, validation = validate_article('tistory_info', data, keyword)
+        with timed(timings, 'assemble'):
+            result = assemble_tistory_info(data, keyword)
+    result.update(persona=persona['role'], structure='', timings=timings, validation=validation)
+    return record_article('tistory_info', result, keyword)
+
+# ==========================================
+# 7. 티스토리 수익형 (t정보.py 완전 이식)
+# ==========================================
+
+BUTTON_PHRASES = [
+    "👉 실시간 혜택 확인하기", "👉 역대급 특가 정보 보기", "👉 품절 전 재고 선점하기",
+    "👉 공식몰 프로모션 확인", "👉 오늘만 진행되는 할인 보기", "👉 사용자 리얼 후기 확인",
+    "👉 놓치면 후회할 최저가 좌표", "👉 지금 바로 상세 정보 확인", "👉 혜택 적용된 최종가 보기"
+]
+
+T_CTA_PHRASES = [
+    "⚠️ 재고 비상! 지금 망설이면 품절각",
+    "⏳ 오늘만 이 가격! 내일이면 정상가",
+    "🚨 긴급 물량 확보! 소량 입고",
+    "⚡ 품절 대란템, 보일 때 잡으세요",
+    "💡 삶의 질 수직 상승! 강력 추천",
+    "✨ 고민은 배송만 늦출 뿐",
+    "💯 후기가 증명합니다",
+    "💰 이 스펙에 이 가격? 사장님 미쳤어요",
+    "👀 이 가격은 여기뿐! 최저가 좌표",
+    "🔥 맘카페 난리 난 바로 그 제품"
+]
+
+CSS_STYLE = """
+<style>
+.blink-border {
+  background: #fbf0f6;
+  border: 3px solid red;
+  border-radius: 11px;
+  padding: 18px 16px;
+  margin: 25px 0;
+  font-family: 'Nanum Gothic', sans-serif;
+  line-height: 1.5;
+  animation: border-blink 0.5s steps(1, end) infinite;
+}
+.banner-wrapper {
+  display: inline-block;
+  border: 3px solid red;
+  padding: 5px;
+  margin: 20px 0;
+  animation: border-blink 0.5s steps(1, end) infinite;
+}
+@keyframes border-blink {
+  0%   { border-color: red; }
+  50%  { border-color: transparent; }
+  100% { border-color: red; }
+}
+.highlight-text {
+  font-weight: 900;
+  font-size: 1.2em;
+}
+.animate-text {
+  display: inline-block;
+  animation: pulseText 1s infinite alternate;
+}
+@keyframes pulseText {
+  from { color: #000; transform: scale(1); }
+  to { color: #e60000; transform: scale(1.1); }
+}
+.animate-emoji {
+  display: inline-block;
+  animation: bounceEmoji 0.8s infinite alternate;
+  font-size: 1.4em;
+  margin-right: 5px;
+}
+@keyframes bounceEmoji {
+  from { transform: scale(1); }
+  to { transform: scale(1.6); }
+}
+.highlight-link {
+  color: #1a3d7c;
+  font-weight: bold;
+  text-decoration: underline;
+  font-size: 1.05em;
+}
+</style>
+"""
+
+def get_random_h3_style_tistory(text, rng=random):
+    """티스토리 수익형 소제목"""
+    color = "#{:06x}".format(rng.randint(0, 0x777777))
+    styles = [
+        f'border-left: 10px solid {color}; border-bottom: 2px solid {color}; padding: 5px 15px; margin: 40px 0 15px 0; font-weight: bold; font-size: 1.3em; display: block;',
+        f'background-color: {color}; color: white; padding: 10px 18px; margin: 40px 0 15px 0; font-weight: bold; border-radius: 5px; display: block;',
+        f'border-bottom: 5px double {color}; padding-bottom: 8px; margin: 40px 0 15px 0; font-weight: bold; font-size: 1.4em; display: block;',
+        f'border: 2px solid {color}; padding: 15px; border-left: 10px solid {color}; border-radius: 0 10px 10px 0; background: #ffffff; margin: 40px 0 15px 0; font-weight: bold; display: block;'
+    ]
+    return f'<br><h3 style="{rng.choice(styles)}">{text}</h3>'
+
+def create_compact_cta_tistory(product_name, product_url, rng=random):
+    """티스토리 애니메이션 CTA"""
+    phrase = rng.choice(T_CTA_PHRASES)
+    full_btn_text = rng.choice(BUTTON_PHRASES)
+    emoji = full_btn_text[0]
+    btn_text_only = full_btn_text[1:].strip()
+    
+    return f"""
+<div class="blink-border">
+    <span class="highlight-text animate-text">{phrase}</span><br />
+    <div style="margin-top: 12px;">
+        <span class="animate-emoji">{emoji}</span>
+        <a class="highlight-link" href="{product_url}" target="_blank" rel="noopener">
+            {btn_text_only} ({product_name})
+        </a>
+    </div>
+</div>
+"""
+
+SYSTEM_INSTRUCTIONS['tistory_profit'] = """
+당신은 구매 심리 마케팅 전문가입니다. 티스토리 수익형 원고 작성 규칙입니다. [제품]은 요청의 제품명으로 바꿔 쓰세요.
+
+[절대 준수]
+1. 자기소개 절대 금지 ("안녕하세요", "저는", "~입니다" 금지)
+2. 제목: [제품] 포함, 20자 내외, 다양한 후킹
+   다음 중 하나 사용:
+   - "[제품] 샀다가 멘붕 온 이유"
+   - "[제품] 이거 모르면 손해"
+   - "[제품] 진실 알려드립니다"
+   - "[제품] vs 경쟁 제품 비교"
+   - "[제품] 숨겨진 비밀"
+   - "[제품] 지금 안 사면 후회"
+3. 첫 줄부터 팩트로 공격 (자기소개 없이!)
+4. **5개 소제목 반드시 <h3>태그 사용!**
+   예: <h3>첫 번째 소제목</h3>
+       <h3>두 번째 소제목</h3>
+5. 중간 [CTA_1], 끝 [CTA_2]
+6. 이미지 금지
+
+[글자수] 2500자 이상
+
+[JSON 응답]
+{
+    "title": "강력한 후킹 제목 20자",
+    "content": "본문",
+    "hashtags": "7개"
+}
+
+JSON만 출력하세요.
+"""
+
+def generate_tistory_profit_prompt(keyword, product_name, facts):
+    """티스토리 수익형 프롬프트 (가변 부분만 - 고정 규칙은 SYSTEM_INSTRUCTIONS['tistory_profit'])"""
+    return f"""
+[정보]
+- 키워드: {keyword}
+- 제품: {product_name}
+- 뉴스: {facts}
+
+JSON만 출력하세요.
+"""
+
+
+def assemble_tistory_profit(data, product_name, product_url, banner_tag="", seed=None):
+    """원고 JSON → 티스토리 수익형 최종 HTML (seed: 스타일/CTA 문구 선택 시드, 없으면 전역 random)"""
+    rng = style_rng(seed)
+    
+    title = data.get('title', f'{product_name} 후기')
+    content = data['content']
+    
+    disclosure = get_ftc_text(product_url)
+    
+    # 소제목 스타일링 + 첫 소제목 앞 외부태그 삽입
+    banner_html = f'<div style="text-align:center;"><div class="banner-wrapper">{banner_tag}</div></div>' if banner_tag else ""
+    pieces, slots = TISTORY_PROFIT_MARKUP.render(content, lambda text: get_random_h3_style_tistory(text, rng), banner_html)
+    
+    # CTA 치환 (마커 유무와 관계없이 CTA 1/2 순서로 생성)
+    ctas = {'1': create_compact_cta_tistory(product_name, product_url, rng)}
+    ctas['2'] = create_compact_cta_tistory(product_name, product_url, rng)
+    content = MarkupRenderer.join(pieces, slots, lambda number, nth: ctas[number])
+    
+    final = f"""
+<div style='font-family: sans-serif; line-height: 2; color: #333; max-width: 800px; margin: auto; word-break: keep-all;'>
+    {CSS_STYLE}
+    <p style='color: #888; font-size: 13px;'>{disclosure}</p><hr>
+    <h1 style='font-size: 1.7em; line-height: 1.4; color: #000; margin-bottom: 20px;'>{title}</h1>
+    {content}
+    <br><div style='color: #aaa; margin-top: 40px; border-top: 1px solid #eee; padding-top: 20px;'>{data.get('hashtags', '')}</div>
+</div>
+"""
+    return {'title': title, 'content': final, 'display': clean_all_tags(final), 'data': data,
+            'assembly': {'product_name': product_name, 'product_url': product_url, 'banner_tag': banner_tag},
+            'seed': seed}
+
+def build_tistory_profit(keyword, product_name, product_url, banner_tag="", stream=False, on_progress=None):
+    """티스토리 수익형 원고 생성"""
+    timings = {}
+    with metric_labels(mode='tistory_profit'), timed(timings, 'total'):
+        with timed(timings, 'search'):
+            facts = hunt_realtime_info(keyword)
+        prompt = generate_tistory_profit_prompt(keyword, product_name, facts)
+        with timed(timings, 'generate'):
+            data = generate_article(prompt, stream, on_progress, 'tistory_profit')
+        with timed(timings, 'validate'):
+            data, validation = validate_article('tistory_profit', data, keyword, product_name)
+        with timed(timings, 'assemble'):
+            result = assemble_tistory_profit(data, product_name, product_url, banner_tag)
+    result.update(persona='', structure='', timings=timings, validation=validation)
+    return record_article('tistory_profit', result, keyword, product_name, product_url)
+
+# ==========================================
+# 8. 스타일 다시 뽑기 (LLM 재호출 없음)
+# ==========================================
+
+# 모드별 조립 함수 - 결과의 data(원고 JSON)와 assembly(조립 인자)만으로 최종 HTML을 다시 만듦
+ASSEMBLERS = {
+    'naver_profit': assemble_naver_profit,
+    'naver_info': assemble_naver_info,
+    'tistory_info': assemble_tistory_info,
+    'tistory_profit': assemble_tistory_profit,
+}
+
+def restyle_article(mode, data, assembly, seed=None):
+    """원고 JSON으로 후처리/HTML 조립만 다시 실행 (소제목 스타일, 구분선, CTA 문구, 배너 등)
+    같은 seed면 항상 같은 결과 (seed가 없으면 새로 뽑아 result['seed']로 반환)"""
+    with metric_labels(mode=mode), metrics.timer('restyle'):
+        return ASSEMBLERS[mode](data, **assembly, seed=style_seed(seed))
+
+# ==========================================
+# 9. 섹션 다시 쓰기
+# ==========================================
+
+SECTION_MARKUP = {
+    'naver_profit': NAVER_MARKUP,
+    'naver_info': H3_MARKUP,
+    'tistory_info': H3_MARKUP,
+    'tistory_profit': TISTORY_PROFIT_MARKUP,
+}
+SECTION_CONTEXT_CHARS = 150   # 앞뒤 섹션에서 함께 보낼 글자 수
+
+def section_headings(mode, content):
+    """다시 쓸 수 있는 섹션 목록 [(섹션 번호, 소제목)] - 도입부는 '도입부', 빈 도입부는 제외"""
+    markup = SECTION_MARKUP[mode]
+    return [(i, markup.heading(section) or "도입부")
+            for i, section in enumerate(markup.sections(content)) if section.strip()]
+
+def _section_context(markup, section, tail):
+    """앞뒤 섹션 요약 - 소제목 + 이어지는 쪽 문장 일부 (태그 제거)"""
+    text = " ".join(clean_all_tags(markup.h3_re.sub('', section)).split())
+    text = text[-SECTION_CONTEXT_CHARS:] if tail else text[:SECTION_CONTEXT_CHARS]
+    heading = markup.heading(section) or "도입부"
+    return f"[{heading}] {'…' + text if tail else text + '…'}"
+
+def generate_section_prompt(mode, keyword, product, sections, index, instruction="", target_chars=None):
+    """섹션 1개 다시 쓰기 프롬프트 (고정 규칙은 모드의 SYSTEM_INSTRUCTIONS)
+    대상 섹션 원문과 전체 소제목 흐름, 앞뒤 섹션 요약만 보냄 (target_chars: 목표 길이, 없으면 원문과 비슷하게)"""
+    markup = SECTION_MARKUP[mode]
+    target = sections[index]
+    outline = "\n".join(f"{i}. {markup.heading(section) or '도입부'}" for i, section in enumerate(sections))
+    before = _section_context(markup, sections[index - 1], tail=True) if index > 0 else "(없음 - 원고 시작)"
+    after = _section_context(markup, sections[index + 1], tail=False) if index + 1 < len(sections) else "(없음 - 원고 끝)"
+    product_line = f"\n- 제품: {product}" if product else ""
+    length = f"원문과 비슷하게 (약 {len(target)}자)" if target_chars is None else f"약 {target_chars}자 (원문 {len(target)}자)"
+    return f"""
+[섹션 다시 쓰기]
+이번 요청은 원고 전체가 아니라 아래 [대상 섹션] 1개만 다시 쓰는 작업입니다.
+- 키워드: {keyword}{product_line}
+- 요청 사항: {instruction or "더 구체적이고 설득력 있게"}
+
+[전체 소제목 흐름]
+{outline}
+
+[앞 섹션 끝부분]
+{before}
+
+[뒤 섹션 시작부분]
+{after}
+
+[대상 섹션 ({len(target)}자)]
+{target}
+
+[규칙]
+- 소제목 표기와 CTA 마커는 원문 형식 그대로 유지
+- 길이는 {length} - 전체 원고용 글자수 규칙은 적용하지 않음
+- 앞뒤 섹션과 내용이 겹치지 않고 자연스럽게 이어지게
+
+[JSON 응답]
+{{"content": "다시 쓴 섹션"}}
+
+JSON만 출력하세요.
+"""
+
+def splice_section(markup, old, new):
+    """다시 쓴 섹션의 마커 보정 - 소제목이 빠지면 원래 소제목 유지, CTA 마커는 원래 섹션에 있던 것만 남김,
+    앞뒤 공백은 원문 그대로 (다음 소제목과 붙지 않도록)"""
+    new = new.strip()
+    heading = markup.h3_re.search(old)
+    if heading and not markup.h3_re.search(new):
+        new = f"{heading.group(0)}\n{new}"
+    if markup.cta_re is not None:
+        kept = {m.group(0) for m in markup.cta_re.finditer(old)}
+        new = markup.cta_re.sub(lambda m: m.group(0) if m.group(0) in kept else '', new)
+        missing = [marker for marker in kept if marker not in new]
+        if missing:
+            new += "\n" + "\n".join(sorted(missing))
+    stripped = old.strip()
+    if not stripped:
+        return old   # 빈 도입부는 그대로
+    lead = old[:len(old) - len(old.lstrip())]
+    trail = old[len(old.rstrip()):]
+    return lead + new + trail
+
+def rewrite_section(mode, keyword, product, sections, index, instruction="", target_chars=None, stream=False,
+                    on_progress=None):
+    """섹션 1개만 모델에 다시 요청 → 마커를 보정한 새 섹션 (sections는 그대로 둠)"""
+    prompt = generate_section_prompt(mode, keyword, product, sections, index, instruction, target_chars)
+    new = generate_article(prompt, stream, on_progress, mode, target_chars or len(sections[index]),
+                           SECTION_SCHEMA)['content']
+    return splice_section(SECTION_MARKUP[mode], sections[index], new)
+
+async def rewrite_section_async(mode, keyword, product, sections, index, instruction="", target_chars=None):
+    """rewrite_section의 비동기 버전"""
+    prompt = generate_section_prompt(mode, keyword, product, sections, index, instruction, target_chars)
+    new = (await generate_article_async(prompt, mode, target_chars or len(sections[index]), SECTION_SCHEMA))['content']
+    return splice_section(SECTION_MARKUP[mode], sections[index], new)
+
+def regenerate_section(mode, data, assembly, index, keyword, instruction="", seed=None, stream=False,
+                       on_progress=None, persona=''):
+    """원고의 섹션 1개만 다시 생성해 끼워 넣고 검수/조립만 다시 실행 (검색/전체 원고 재생성 없음)
+    index 0은 첫 소제목 앞 도입부. seed를 주면 다른 섹션의 스타일이 그대로 유지됨 (없으면 새로 뽑아 result['seed']로 반환)
+    persona: 원래 원고의 페르소나 (저장 기록에 그대로 남김). 반환은 build_* 결과와 같은 형식"""
+    markup = SECTION_MARKUP[mode]
+    sections = markup.sections(data['content'])
+    product = assembly.get('product') or assembly.get('product_name', '')
+    url = assembly.get('url') or assembly.get('product_url', '')
+    
+    timings = {}
+    with metric_labels(mode=mode, persona=persona, structure='섹션 다시 쓰기'), timed(timings, 'total'):
+        with timed(timings, 'generate'):
+            sections[index] = rewrite_section(mode, keyword, product, sections, index, instruction,
+                                              stream=stream, on_progress=on_progress)
+        with timed(timings, 'validate'):
+            data, validation = validate_article(mode, {**data, 'content': ''.join(sections)}, keyword, product)
+        with timed(timings, 'assemble'):
+            result = ASSEMBLERS[mode](data, **assembly, seed=style_seed(seed))
+    result.update(persona=persona, structure='', timings=timings, section=index, validation=validation)
+    return record_article(mode, result, keyword, product, url)
+
+# ==========================================
+# 10. 원고 검수 / 자동 교정
+# ==========================================
+
+VALIDATE_MAX_REPAIRS = int(os.getenv("GHOST_VALIDATE_REPAIRS") or 2)   # 원고당 모델에 다시 보낼 섹션 수 (0이면 로컬 교정만)
+LENGTH_SLACK = 0.1   # 글자 수 규칙을 이 비율만큼 벗어나야 다시 요청 (조금 모자라거나 넘치는 건 허용)
+FAQ_EXTRA_CHARS = 300   # FAQ를 채워 넣을 섹션에 더해 줄 목표 글자 수
+
+ISSUE_LABELS = {
+    'greeting': "인사말",
+    'intro': "자기소개",
+    'coupang': "쿠팡 언급",
+    'closing': "마무리 멘트",
+    'markdown': "마크다운",
+    'date': "날짜 노출",
+    'cta': "CTA 마커",
+    'length': "글자 수",
+    'faq': "FAQ",
+}
+# 프롬프트가 금지하는 형태 그대로인 패턴만 고침 (단어만 겹치는 금지 문구는 알리기만 함)
+# 자기소개 "저는 ~입니다/예요" → 문장 삭제, 글 첫머리 인사말 → 문장 삭제, 결론/마무리 소제목 → 섹션 다시 쓰기
+SELF_INTRO = re.compile(r'(?<!\w)저는[ \t]+(?:[^\s.!?<\[]+[ \t]+){0,3}?[^\s.!?<\[]*?(?:입니다|이에요|예요)(?!\w)')
+OPENING_GREETING = re.compile(r'안녕하세요|반갑습니다|알아보겠습니다|알아볼게요|알아볼까요|소개해[ \t]*드릴게요|소개해[ \t]*드리겠습니다')
+CLOSING_HEADING = re.compile(r'^[\W\d_]*(?:결론|마무리(?:하며)?|마치며|맺음말|끝으로)(?!\w)')
+
+DATE_PATTERN = re.compile(
+    r'([ \t]?\(\s*)?'   # 괄호 앞 공백 1칸 포함 - 괄호째 지울 때 공백이 두 칸으로 남지 않도록
+    r'(?:(?:19|20)\d{2}\s*년\s*\d{1,2}\s*월(?:\s*\d{1,2}\s*일)?|\d{1,2}\s*월\s*\d{1,2}\s*일|(?:19|20)\d{2}[./-]\d{1,2}[./-]\d{1,2}\.?)'
+    r'(\s*(?:기준|현재))?(\s*\))?')
+MARKDOWN_BOLD = re.compile(r'\*\*(.+?)\*\*')
+MARKDOWN_HEADING = re.compile(r'^#{1,6}[ \t]*(.+?)[ \t]*$', re.MULTILINE)
+
+def _replace_date(m):
+    # "(10월 17일 기준)"은 앞 공백 1칸과 함께 괄호째 제거, 나머지는 "현재"/"최근"으로 바꿔 문장이 끊기지 않게
+    if m.group(1) and m.group(3):
+        return ''
+    return (m.group(1) or '') + ("현재" if m.group(2) else "최근") + (m.group(3) or '')
+
+def _sentence_span(text, start, end):
+    """start~end를 포함하는 문장 범위 (뒤 공백 포함, 태그/마커 경계는 넘지 않음)"""
+    left = start
+    while left > 0 and text[left - 1] not in '!?\n>]' and not (text[left - 1] == '.' and text[left].isspace()):
+        left -= 1
+    while left < start and text[left] in ' \t':
+        left += 1
+    right = end
+    while right < len(text) and text[right] not in '!?\n<[' and not (
+            text[right] == '.' and (right + 1 == len(text) or text[right + 1].isspace())):
+        right += 1
+    while right < len(text) and text[right] in '.!?~':
+        right += 1
+    while right < len(text) and text[right] in ' \t':
+        right += 1
+    return left, right
+
+def _remove_spans(text, spans):
+    """겹치는 범위를 합쳐 뒤에서부터 제거 (줄 전체가 지워지면 줄바꿈도, 줄 끝까지 지워지면 남은 끝 공백도 함께)"""
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    for start, end in reversed(merged):
+        if (start == 0 or text[start - 1] == '\n') and text[end:end + 1] == '\n':
+            end += 1
+        head = text[:start]
+        if text[end:end + 1] in ('\n', ''):
+            head = head.rstrip(' \t')   # 줄 끝 문장을 지우면 앞 문장 뒤 공백도 정리
+        text = head + text[end:]
+    return text
+
+class ContentRules:
+    """모드별 원고 검수 규칙 - 금지 문구/마커를 검색기 1개로 미리 묶어 두고 본문을 한 번만 스캔
+    banned: {분류: [문구]}, length: (최소, 최대) 글자 수 (태그/마커 제외, None이면 제한 없음),
+    ctas: [(필수 CTA 마커, 넣을 자리)] - 자리는 섹션 번호 / 'middle' / 'faq'(FAQ 직전) / 'end',
+    faq: 필수 FAQ 표시, markers: 글자 수에서 뺄 마커, dates/markdown: 날짜/마크다운 검사 여부,
+    patterns: 고칠 금지 패턴 ('greeting' 첫머리 인사말, 'intro' 자기소개, 'closing' 결론/마무리 소제목)
+    banned 문구는 단어만 겹쳐도 잡히므로("마무리감", "결론부터") 알리기만 하고 고치지 않음"""
+    def __init__(self, markup, banned=None, length=(None, None), ctas=(), faq=(), markers=(), dates=False,
+                 markdown=False, patterns=()):
+        self.markup = markup
+        self.patterns = set(patterns)
+        self.length = length
+        self.ctas = list(ctas)
+        self.faq = list(faq)
+        self.dates = dates
+        self.markdown = markdown
+        phrases = {marker: 'marker' for marker in markers}
+        for kind, words in (banned or {}).items():
+            phrases.update(dict.fromkeys(words, kind))
+        if markdown:
+            phrases.update({'**': 'markdown', '##': 'markdown'})
+        phrases.update({marker: 'cta' for marker, _ in self.ctas})
+        phrases.update(dict.fromkeys(self.faq, 'faq'))
+        self.matcher = PhraseMatcher(phrases)
+    
+    def _opening_sentences(self, content):
+        """글 첫머리 문장 범위를 차례로 (앞쪽 공백/소제목/태그/마커는 건너뜀)"""
+        pos = 0
+        while pos < len(content):
+            if content[pos].isspace():
+                pos += 1
+                continue
+            m = self.markup.h3_re.match(content, pos)
+            if m:
+                pos = m.end()
+                continue
+            if content[pos] in '<[':
+                close = content.find('>' if content[pos] == '<' else ']', pos)
+                pos = len(content) if close < 0 else close + 1
+                continue
+            start, end = _sentence_span(content, pos, pos)
+            yield start, end
+            pos = max(end, pos + 1)
+
+    def _pattern_issues(self, content):
+        """고칠 금지 패턴 → 문제 목록 (fix: 'sentence' 문장 삭제 / 'section' 섹션 다시 쓰기)"""
+        issues = []
+        if 'greeting' in self.patterns:
+            # 첫머리에서 이어지는 인사/예고 문장만 ("안녕하세요! 오늘은 ~ 알아보겠습니다.")
+            for start, end in self._opening_sentences(content):
+                m = OPENING_GREETING.search(content, start, end)
+                if not m:
+                    break
+                issues.append({'kind': 'greeting', 'message': f"{ISSUE_LABELS['greeting']}: '{m.group(0)}'",
+                               'start': m.start(), 'end': m.end(), 'phrase': m.group(0), 'fix': 'sentence'})
+        if 'intro' in self.patterns:
+            for m in SELF_INTRO.finditer(content):
+                issues.append({'kind': 'intro', 'message': f"{ISSUE_LABELS['intro']}: '{m.group(0)}'",
+                               'start': m.start(), 'end': m.end(), 'phrase': m.group(0), 'fix': 'sentence'})
+        if 'closing' in self.patterns:
+            for m in self.markup.h3_re.finditer(content):
+                heading = clean_all_tags(m.group(1)).strip()
+                if CLOSING_HEADING.match(heading):
+                    issues.append({'kind': 'closing', 'message': f"{ISSUE_LABELS['closing']}: 소제목 '{heading}'",
+                                   'start': m.start(), 'end': m.end(), 'phrase': heading, 'fix': 'section'})
+        return issues
+
+    def check(self, content):
+        """검수 → {'length': 글자 수, 'issues': [{'kind', 'message', 'start', 'end', 'phrase', 'fix'}]}
+        금지 문구/CTA/FAQ/글자 수는 스캔 1회로, 금지 패턴/날짜는 정규식으로 확인
+        fix: 'sentence'/'section'이면 고칠 대상, None이면 알리기만 (단어만 겹친 금지 문구)"""
+        matches, length = self.matcher.scan(content)
+        issues = self._pattern_issues(content)
+        covered = [(issue['start'], issue['end']) for issue in issues]
+        ctas, faq = {}, set()
+        for start, end, phrase, kind in matches:
+            if kind in ('marker', 'cta'):
+                length -= end - start
+            if kind == 'cta':
+                ctas.setdefault(phrase, []).append((start, end))
+            elif kind == 'faq':
+                faq.add(phrase)
+            elif kind == 'markdown':
+                issues.append({'kind': kind, 'message': f"{ISSUE_LABELS[kind]}: '{phrase}'",
+                               'start': start, 'end': end, 'phrase': phrase})
+            elif kind != 'marker' and not any(s <= start and end <= e for s, e in covered):
+                issues.append({'kind': kind, 'message': f"{ISSUE_LABELS[kind]}: '{phrase}' (확인 필요)",
+                               'start': start, 'end': end, 'phrase': phrase, 'fix': None})
+        if self.dates:
+            for m in DATE_PATTERN.finditer(content):
+                issues.append({'kind': 'date', 'message': f"{ISSUE_LABELS['date']}: '{m.group(0).strip()}'",
+                               'start': m.start(), 'end': m.end(), 'phrase': m.group(0)})
+        for marker, _ in self.ctas:
+            spans = ctas.get(marker, [])
+            if len(spans) != 1:
+                issues.append({'kind': 'cta', 'message': f"{ISSUE_LABELS['cta']}: {marker} {len(spans)}개",
+                               'start': None, 'end': None, 'phrase': marker, 'spans': spans})
+        missing = [mark for mark in self.faq if mark not in faq]
+        if missing:
+            issues.append({'kind': 'faq', 'message': f"{ISSUE_LABELS['faq']}: {', '.join(missing)} 없음",
+                           'start': None, 'end': None, 'phrase': ''})
+        low, high = self.length
+        if (low and length < low * (1 - LENGTH_SLACK)) or (high and length > high * (1 + LENGTH_SLACK)):
+            rule = f"{low or 0}~{high}자" if high else f"{low}자 이상"
+            issues.append({'kind': 'length', 'message': f"{ISSUE_LABELS['length']}: {length}자 (규칙 {rule})",
+                           'start': None, 'end': None, 'phrase': ''})
+        return {'length': length, 'issues': issues}
+    
+    def _heading_spans(self, content):
+        return [m.span() for m in self.markup.h3_re.finditer(content)]
+    
+    def _cta_position(self, content, place):
+        """CTA 마커를 넣을 위치 (섹션 끝 / FAQ가 시작되는 섹션 앞 / 본문 끝)"""
+        sections = self.markup.sections(content)
+        if place == 'faq':
+            first = min((content.find(mark) for mark in self.faq if mark in content), default=-1)
+            if first < 0:
+                return len(content)
+            start = 0
+            for section in sections:
+                if start + len(section) > first:
+                    # FAQ 소제목 바로 아래에서 시작하면 소제목 앞에, 아니면 FAQ 줄 앞에
+                    if not self.markup.h3_re.sub('', content[start:first]).strip():
+                        return start
+                    return content.rfind('\n', 0, first) + 1
+                start += len(section)
+            return len(content)
+        if place == 'end':
+            return len(content)
+        index = len(sections) // 2 if place == 'middle' else min(place, len(sections) - 1)
+        return len(content[:sum(len(section) for section in sections[:index + 1])].rstrip())
+    
+    def fix(self, content):
+        """로컬 교정 (LLM 호출 없음) → (교정된 본문, 교정한 분류 목록, 교정 후 검수 결과)
+        마크다운 → <b>/소제목 마커, 날짜 → 제거/'현재', 자기소개/첫머리 인사말 문장 삭제,
+        CTA 마커 중복 제거/빠진 자리에 삽입 (단어만 겹친 금지 문구는 그대로 둠)"""
+        fixed = []
+        report = self.check(content)
+        kinds = {issue['kind'] for issue in report['issues']}
+        if 'markdown' in kinds:
+            content = MARKDOWN_BOLD.sub(r'<b>\1</b>', content)
+            content = MARKDOWN_HEADING.sub(r'[H3]\1[/H3]', content)
+            fixed.append('markdown')
+        if 'date' in kinds:
+            content = DATE_PATTERN.sub(_replace_date, content)
+            fixed.append('date')
+        if fixed:
+            report = self.check(content)
+        
+        # 소제목 안의 금지 패턴은 문장 삭제로 고칠 수 없으므로 남김 (섹션 다시 쓰기 대상)
+        headings = self._heading_spans(content)
+        spans = []
+        for issue in report['issues']:
+            if issue.get('fix') == 'sentence' and not any(s <= issue['start'] < e for s, e in headings):
+                spans.append(_sentence_span(content, issue['start'], issue['end']))
+                if issue['kind'] not in fixed:
+                    fixed.append(issue['kind'])
+        # 중복 CTA 마커는 첫 번째만 남김
+        spans += [span for issue in report['issues'] if issue['kind'] == 'cta' for span in issue['spans'][1:]]
+        if spans:
+            content = _remove_spans(content, spans)
+        missing = [marker for marker, _ in self.ctas if marker not in content]
+        for marker, place in self.ctas:
+            if marker in missing:
+                position = self._cta_position(content, place)
+                content = f"{content[:position].rstrip()}\n{marker}\n{content[position:].lstrip(' ')}"
+        if any(issue['kind'] == 'cta' for issue in report['issues']) and 'cta' not in fixed:
+            fixed.append('cta')
+        if spans or missing:
+            report = self.check(content)
+        return content, fixed, report
+    
+    def plan_repairs(self, content, report):
+        """로컬로 못 고친 문제 → 다시 쓸 섹션 {섹션 번호: (요청 사항 목록, 목표 글자 수)}
+        결론/마무리 소제목·소제목 속 금지 패턴 → 그 섹션, FAQ 누락 → 마지막 섹션, 글자 수 → 가장 긴 섹션
+        (알리기만 하는 금지 문구는 다시 쓰지 않음)"""
+        sections = self.markup.sections(content)
+        starts = [0]
+        for section in sections[:-1]:
+            starts.append(starts[-1] + len(section))
+        repairs = {}
+        
+        def add(index, instruction, target=None):
+            instructions, old_target = repairs.get(index, ([], None))
+            instructions.append(instruction)
+            repairs[index] = (instructions, target or old_target)
+        
+        for issue in report['issues']:
+            kind = issue['kind']
+            if issue.get('fix') == 'section':
+                index = max(i for i, start in enumerate(starts) if start <= issue['start'])
+                add(index, f"'{issue['phrase']}' 같은 {ISSUE_LABELS[kind]} 소제목 대신 내용에 맞는 소제목으로, "
+                           f"정리/요약 없이")
+            elif issue.get('fix') == 'sentence':
+                index = max(i for i, start in enumerate(starts) if start <= issue['start'])
+                add(index, f"'{issue['phrase']}' 같은 {ISSUE_LABELS[kind]} 표현 없이 (소제목 포함)")
+            elif kind == 'faq':
+                index = len(sections) - 1
+                add(index, f"FAQ {', '.join(self.faq)}를 빠짐없이 질문과 답변으로 포함",
+                    len(sections[index]) + FAQ_EXTRA_CHARS)
+            elif kind == 'length':
+                index = max(range(len(sections)), key=lambda i: len(sections[i]))
+                low, high = self.length
+                if low and report['length'] < low:
+                    delta = low - report['length']
+                    add(index, f"내용을 보강해 약 {delta}자 늘려서", len(sections[index]) + delta)
+                else:
+                    delta = report['length'] - high
+                    add(index, f"핵심만 남겨 약 {delta}자 줄여서", max(len(sections[index]) - delta, 200))
+        return repairs
+
+CONTENT_RULES = {
+    'naver_profit': ContentRules(
+        NAVER_MARKUP,
+        banned={'greeting': ["안녕하세요", "오늘은", "알아보겠습니다", "알아볼게요"],
+                'intro': ["블로거"],
+                'coupang': ["쿠팡"],
+                'closing': ["결론", "마무리", "마치며"]},
+        length=(1800, 2400), ctas=[('[[CTA_1]]', 3), ('[[CTA_2]]', 'faq')], faq=['Q1', 'Q2', 'Q3'],
+        markers=['[H3]', '[/H3]'], dates=True, markdown=True, patterns=('greeting', 'intro', 'closing')),
+    'naver_info': ContentRules(
+        H3_MARKUP,
+        banned={'greeting': ["안녕하세요", "알아보겠습니다", "알아볼게요"],
+                'closing': ["마무리", "마치며"]},
+        length=(1800, 2400), faq=['Q1', 'Q2', 'Q3'], markers=['[H3]', '[/H3]'], dates=True, markdown=True,
+        patterns=('greeting', 'intro', 'closing')),
+    'tistory_info': ContentRules(H3_MARKUP, length=(1800, 2400), markers=['[H3]', '[/H3]']),
+    'tistory_profit': ContentRules(
+        TISTORY_PROFIT_MARKUP,
+        banned={'greeting': ["안녕하세요"]},
+        length=(2500, None), ctas=[('[CTA_1]', 'middle'), ('[CTA_2]', 'end')], patterns=('greeting', 'intro')),
+}
+
+def _local_validation(mode, data):
+    """로컬 교정 → (규칙, 본문, 교정 분류, 검수 결과, 모델에 다시 보낼 섹션 [(번호, (요청 사항, 목표 글자 수))])"""
+    rules = CONTENT_RULES[mode]
+    content, fixed, report = rules.fix(data.get('content', ''))
+    repairs = rules.plan_repairs(content, report) if VALIDATE_MAX_REPAIRS else {}
+    return rules, content, fixed, report, list(repairs.items())[:VALIDATE_MAX_REPAIRS]
+
+def _validation_result(rules, data, content, fixed, report, sections, repaired):
+    """섹션을 다시 썼으면 한 번 더 로컬 교정 → (교정된 원고 JSON, 검수 결과)"""
+    if repaired:
+        content, refixed, report = rules.fix(''.join(sections))
+        fixed += [kind for kind in refixed if kind not in fixed]
+    validation = {'length': report['length'], 'fixed': fixed, 'repaired': repaired,
+                  'issues': [issue['message'] for issue in report['issues']]}
+    return {**data, 'content': content}, validation
+
+def validate_article(mode, data, keyword, product=''):
+    """원고 JSON 검수/교정 → (교정된 원고 JSON, 검수 결과)
+    로컬로 고칠 수 있는 문제는 바로 고치고, 남은 문제(글자 수/FAQ/소제목 속 금지 문구)는 해당 섹션만 모델에 다시 요청
+    검수 결과: {'length': 글자 수, 'fixed': [로컬 교정 분류], 'repaired': [다시 쓴 섹션 번호], 'issues': [남은 문제]}"""
+    rules, content, fixed, report, repairs = _local_validation(mode, data)
+    sections = rules.markup.sections(content)
+    repaired = []
+    for index, (instructions, target) in repairs:
+        try:
+            sections[index] = rewrite_section(mode, keyword, product, sections, index, ", ".join(instructions), target)
+        except Exception as e:
+            print(f"섹션 자동 수정 실패 ({index}번): {e}", file=sys.stderr)
+            break
+        repaired.append(index)
+    return _validation_result(rules, data, content, fixed, report, sections, repaired)
+
+async def validate_article_async(mode, data, keyword, product=''):
+    """validate_article의 비동기 버전 - 로컬 교정은 스레드에서, 섹션 다시 쓰기는 비동기 Gemini 호출로"""
+    rules, content, fixed, report, repairs = await asyncio.to_thread(_local_validation, mode, data)
+    sections = rules.markup.sections(content)
+    repaired = []
+    for index, (instructions, target) in repairs:
+        try:
+            sections[index] = await rewrite_section_async(mode, keyword, product, sections, index,
+                                                          ", ".join(instructions), target)
+        except Exception as e:
+            print(f"섹션 자동 수정 실패 ({index}번): {e}", file=sys.stderr)
+            break
+        repaired.append(index)
+    return await asyncio.to_thread(_validation_result, rules, data, content, fixed, report, sections, repaired)
+
+# ==========================================
+# 11. 배치
+# ==========================================
+
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY") or 8)
+BATCH_MAX_RETRIES = 2   # 행별 자동 재시도 횟수 (요청 계층이 재시도하지 않는 형식 오류만)
+BATCH_FIELDS = ['mode', 'keyword', 'product', 'url', 'banner']
+BATCH_MODES = {
+    'naver_profit': ("네이버 수익형", ['keyword', 'product', 'url']),
+    'naver_info': ("네이버 정보성", ['keyword']),
+    'tistory_info': ("티스토리 정보성", ['keyword']),
+    'tistory_profit': ("티스토리 수익형", ['keyword', 'product', 'url']),
+}
+
+def parse_batch_file(name, raw):
+    """CSV/JSONL 업로드 → 배치 항목 목록 (필수값 누락 행은 '오류' 상태)"""
+    text = raw.decode('utf-8-sig')
+    if name.lower().endswith('.jsonl'):
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        rows = list(csv.DictReader(io.StringIO(text)))
+    
+    items = []
+    for row in rows:
+        row = {str(k).strip().lower(): str(v or '').strip() for k, v in row.items() if k}
+        row = {field: row.get(field, '') for field in BATCH_FIELDS}
+        error = ""
+        if row['mode'] not in BATCH_MODES:
+            error = f"알 수 없는 모드: {row['mode'] or '(빈 값)'}"
+        else:
+            missing = [f for f in BATCH_MODES[row['mode']][1] if not row[f]]
+            if missing:
+                error = f"필수 항목 누락: {', '.join(missing)}"
+        items.append({'row': row, 'status': '오류' if error else '대기', 'attempts': 0, 'error': error, 'result': None})
+    return items
+
+def run_batch_row(row):
+    """배치 1행 생성 - 모드별 빌더 호출"""
+    mode = row['mode']
+    if mode == 'naver_profit':
+        return build_naver_profit(row['keyword'], row['product'], row['url'])
+    if mode == 'naver_info':
+        return build_naver_info(row['keyword'])
+    if mode == 'tistory_info':
+        return build_tistory_info(row['keyword'])
+    return build_tistory_profit(row['keyword'], row['product'], row['url'], row['banner'])
+
+def batch_should_retry(error, attempt):
+    """행을 처음부터 다시 생성할지 - JSON 모드 재요청까지 실패한 형식 오류(LLMJSONError)만
+    네트워크/마감/429 오류는 요청 계층이 이미 재시도(+헤지)했으므로 행 단위로 다시 하면 호출만 몇 배로 늘어남"""
+    return attempt < BATCH_MAX_RETRIES and isinstance(error, LLMJSONError)
+
+def process_batch_item(item):
+    """형식 오류면 지터 백오프 후 재시도 (배치 전체는 계속 진행)"""
+    item['status'] = '진행 중'
+    for attempt in range(BATCH_MAX_RETRIES + 1):
+        item['attempts'] += 1
+        try:
+            item['result'] = run_batch_row(item['row'])
+            item['status'], item['error'] = '완료', ""
+            return
+        except Exception as e:
+            item['error'] = str(e)
+            if not batch_should_retry(e, attempt):
+                break
+            time.sleep(backoff_delay(attempt))
+    item['status'] = '실패'
+
+# ==========================================
+# 12. 비동기 엔진
+# ==========================================
+# DDGS는 비동기 API가 없고 Unsplash는 공용 커넥션 풀/디스크 캐시를 공유해야 하므로
+# 두 호출은 asyncio.to_thread로 실행하고, Gemini만 네이티브 비동기 클라이언트를 사용
+
+async def build_naver_profit_async(keyword, product, url, persona=None, structure=None):
+    """네이버 수익형 원고 생성 (비동기)"""
+    persona = persona or random.choice(NAVER_PROFIT_PERSONAS)
+    structure = structure or NAVER_PROFIT_STRUCTURES[random.randint(1, 5)]
+    
+    timings = {}
+    with metric_labels(mode='naver_profit', persona=persona['role'], structure=structure['name']), timed(timings, 'total'):
+        with timed(timings, 'search'):
+            facts = await asyncio.to_thread(hunt_realtime_info, keyword)
+        prompt = generate_naver_profit_prompt(keyword, product, url, facts, persona, structure)
+        with timed(timings, 'generate'):
+            data = await generate_article_async(prompt, 'naver_profit')
+        with timed(timings, 'validate'):
+            data, validation = await validate_article_async('naver_profit', data, keyword, product)
+        with timed(timings, 'assemble'):
+            result = assemble_naver_profit(data, keyword, product, url)
+    result.update(persona=persona['role'], structure=structure['name'], timings=timings, validation=validation)
+    return await asyncio.to_thread(record_article, 'naver_profit', result, keyword, product, url)
+
+async def build_naver_info_async(keyword, persona=None, info_type=None):
+    """네이버 정보성 원고 생성 (비동기) - 이미지 검색은 검색/생성과 동시에 진행"""
+    persona = persona or random.choice(NAVER_INFO_PERSONAS)
+    info_type = info_type or random.choice(INFO_TYPES)
+    
+    timings = {}
+    
+    async def write():
+        with timed(timings, 'search'):
+            facts = await asyncio.to_thread(hunt_realtime_info, keyword)
+        with timed(timings, 'generate'):
+            return await generate_article_async(generate_naver_info_prompt(keyword, facts, persona, info_type),
+                                                'naver_info')
+    
+    async def images():
+        with timed(timings, 'images'):
+            return await asyncio.to_thread(fetch_unsplash_images, keyword, 7)
+    
+    with metric_labels(mode='naver_info', persona=persona['role'], structure=info_type), timed(timings, 'total'):
+        data, (image_list, level, message) = await asyncio.gather(write(), images())
+        with timed(timings, 'validate'):
+            data, validation = await validate_article_async('naver_info', data, keyword)
+        with timed(timings, 'assemble'):
+            result = assemble_naver_info(data, keyword, image_list)
+    result.update(persona=persona['role'], structure=info_type, notice=(level, message), timings=timings,
+                  validation=validation)
+    return await asyncio.to_thread(record_article, 'naver_info', result, keyword)
+
+async def build_tistory_info_async(keyword, persona=None):
+    """티스토리 정보성 원고 생성 (비동기)"""
+    persona = persona or random.choice(TISTORY_INFO_PERSONAS)
+    timings = {}
+    with metric_labels(mode='tistory_info', persona=persona['role']), timed(timings, 'total'):
+        with timed(timings, 'search'):
+            facts = await asyncio.to_thread(hunt_realtime_info, keyword)
+        with timed(timings, 'generate'):
+            data = await generate_article_async(generate_tistory_info_prompt(keyword, facts, persona), 'tistory_info')
+        with timed(timings, 'validate'):
+            data, validation = await validate_article_async('tistory_info', data, keyword)
+        with timed(timings, 'assemble'):
+            result = assemble_tistory_info(data, keyword)
+    result.update(persona=persona['role'], structure='', timings=timings, validation=validation)
+    return await asyncio.to_thread(record_article, 'tistory_info', result, keyword)
+
+async def build_tistory_profit_async(keyword, product_name, product_url, banner_tag=""):
+    """티스토리 수익형 원고 생성 (비동기)"""
+    timings = {}
+    with metric_labels(mode='tistory_profit'), timed(timings, 'total'):
+        with timed(timings, 'search'):
+            facts = await asyncio.to_thread(hunt_realtime_info, keyword)
+        with timed(timings, 'generate'):
+            data = await generate_article_async(generate_tistory_profit_prompt(keyword, product_name, facts),
+                                                'tistory_profit')
+        with timed(timings, 'validate'):
+            data, validation = await validate_article_async('tistory_profit', data, keyword, product_name)
+        with timed(timings, 'assemble'):
+            result = assemble_tistory_profit(data, product_name, product_url, banner_tag)
+    result.update(persona='', structure='', timings=timings, validation=validation)
+    return await asyncio.to_thread(record_article, 'tistory_profit', result, keyword, product_name, product_url)
+
+async def run_batch_row_async(row):
+    """배치 1행 생성 (비동기)"""
+    mode = row['mode']
+    if mode == 'naver_profit':
+        return await build_naver_profit_async(row['keyword'], row['product'], row['url'])
+    if mode == 'naver_info':
+        return await build_naver_info_async(row['keyword'])
+    if mode == 'tistory_info':
+        return await build_tistory_info_async(row['keyword'])
+    return await build_tistory_profit_async(row['keyword'], row['product'], row['url'], row['banner'])
+
+async def run_batch_async(items, concurrency=BATCH_MAX_CONCURRENCY, on_done=None):
+    """'대기' 상태 항목을 동시 실행 수 제한 내에서 생성 (행별 재시도는 process_batch_item과 같은 규칙)
+    on_done(item): 항목이 끝날 때마다 호출"""
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def process(item):
+        async with semaphore:
+            item['status'] = '진행 중'
+            for attempt in range(BATCH_MAX_RETRIES + 1):
+                item['attempts'] += 1
+                try:
+                    item['result'] = await run_batch_row_async(item['row'])
+                    item['status'], item['error'] = '완료', ""
+                    break
+                except Exception as e:
+                    item['error'] = str(e)
+                    if not batch_should_retry(e, attempt):
+                        item['status'] = '실패'
+                        break
+                    await asyncio.sleep(backoff_delay(attempt))
+        if on_done:
+            on_done(item)
+    
+    await asyncio.gather(*(process(item) for item in items if item['status'] == '대기'))
+    return items
+
+# ==========================================
+# 13. CLI
+# ==========================================
+
+def _result_record(row, result, item=None):
+    """JSONL 출력용 레코드"""
+    record = dict(row)
+    if item is not None:
+        record.update(status=item['status'], attempts=item['attempts'], error=item['error'])
+    for key in ('title', 'content', 'display', 'persona', 'structure'):
+        record[key] = (result or {}).get(key, '')
+    record['validation'] = (result or {}).get('validation')
+    return record
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="ghost_engine", description="GHOST HUB 원고 생성 CLI")
+    parser.add_argument('--metrics-jsonl', help="단계별 소요 시간을 JSON Lines로 저장")
+    parser.add_argument('--metrics-prom', help="단계별 소요 시간을 Prometheus 텍스트 파일로 저장")
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    for mode, (label, _) in BATCH_MODES.items():
+        p = sub.add_parser(mode, help=f"{label} 원고 1건 생성")
+        p.add_argument('--keyword', required=True)
+        p.add_argument('--product', default='')
+        p.add_argument('--url', default='')
+        p.add_argument('--banner', default='')
+        p.add_argument('--format', choices=['html', 'json'], default='html')
+        p.add_argument('--out', help="출력 파일 (기본: stdout)")
+    
+    p = sub.add_parser('batch', help="CSV/JSONL 파일 일괄 생성")
+    p.add_argument('file')
+    p.add_argument('--concurrency', type=int, default=BATCH_MAX_CONCURRENCY)
+    p.add_argument('--out', help="결과 JSONL 파일 (기본: stdout)")
+    
+    args = parser.parse_args(argv)
+    
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(encoding='utf-8')
+        sys.stderr.reconfigure(encoding='utf-8')
+    
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        parser.error("GEMINI_API_KEY 환경변수(.env)가 필요합니다.")
+    configure(api_key, os.getenv("UNSPLASH_ACCESS_KEY"))
+    
+    out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    try:
+        if args.command == 'batch':
+            with open(args.file, 'rb') as f:
+                items = parse_batch_file(args.file, f.read())
+            
+            def report(item):
+                print(f"[{item['status']}] {item['row']['mode']} {item['row']['keyword']} {item['error']}", file=sys.stderr)
+            
+            asyncio.run(run_batch_async(items, args.concurrency, report))
+            for item in items:
+                out.write(json.dumps(_result_record(item['row'], item['result'], item), ensure_ascii=False) + "\n")
+            failed = sum(item['status'] != '완료' for item in items)
+            return 1 if failed else 0
+        
+        row = {'mode': args.command, 'keyword': args.keyword, 'product': args.product,
+               'url': args.url, 'banner': args.banner}
+        missing = [f for f in BATCH_MODES[args.command][1] if not row[f]]
+        if missing:
+            parser.error(f"필수 항목 누락: {', '.join('--' + f for f in missing)}")
+        result = asyncio.run(run_batch_row_async(row))
+        if args.format == 'json':
+            out.write(json.dumps(_result_record(row, result), ensure_ascii=False) + "\n")
+        else:
+            out.write(result['content'] + "\n")
+        return 0
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        write_metrics(args.metrics_jsonl, args.metrics_prom)
+
+def write_metrics(jsonl_path=None, prom_path=None):
+    """성능 계측 결과 내보내기 (Prometheus 파일은 textfile collector가 읽다 깨지지 않게 원자적 교체)"""
+    if jsonl_path:
+        with open(jsonl_path, 'w', encoding='utf-8') as f:
+            f.write(metrics.to_jsonl())
+    if prom_path:
+        tmp = f"{prom_path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(metrics.to_prometheus())
+        os.replace(tmp, prom_path)
+
+if __name__ == "__main__":
+    sys.exit(main())
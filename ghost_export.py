@@ -0,0 +1,53 @@
+"""GHOST HUB 원고 일괄 내보내기 - 저장된 원고를 ZIP(HTML + 평문 + JSON 메타데이터)으로 묶음"""
+import re
+import json
+import zipfile
+import tempfile
+from datetime import datetime
+
+from ghost_engine import clean_all_tags
+from ghost_store import get_store
+
+EXPORT_SPOOL_SIZE = 8 * 1024 * 1024   # 작성 중 압축 결과를 이 크기까지는 메모리, 넘으면 임시 파일에 기록
+
+_UNSAFE_NAME = re.compile(r'[\\/:*?"<>|\s]+')
+
+def export_name(article):
+    """ZIP 안 파일 이름 (확장자 제외) - id_모드_키워드"""
+    keyword = _UNSAFE_NAME.sub('_', article['keyword']).strip('_')[:40] or 'article'
+    return f"{article['id']:05d}_{article['mode']}_{keyword}"
+
+def export_metadata(article):
+    """JSON 메타데이터 (본문 HTML 제외, 원고 JSON/조립 인자 포함)"""
+    meta = {key: value for key, value in article.items() if key not in ('html', 'keyword_norm')}
+    meta['created_at'] = datetime.fromtimestamp(article['created_at']).isoformat(timespec='seconds')
+    meta['data'] = meta.pop('raw_json') or None
+    return meta
+
+def write_articles_zip(fileobj, article_ids, store=None):
+    """원고를 1건씩 읽어 fileobj에 ZIP으로 기록 → 기록한 원고 수
+    원고마다 .html(최종 HTML), .txt(clean_all_tags 평문), .json(메타데이터)
+    메모리는 원고 1건분(원문 + 인코딩본)만 쓰고, 압축 결과는 fileobj로 바로 나감 (파일이면 원고 수와 무관)"""
+    store = store or get_store()
+    count = 0
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for article_id in article_ids:
+            article = store.get(article_id)
+            if article is None:
+                continue   # 그 사이 지워진 원고
+            name = export_name(article)
+            zf.writestr(f"{name}.html", article['html'])
+            zf.writestr(f"{name}.txt", clean_all_tags(article['html']))
+            zf.writestr(f"{name}.json", json.dumps(export_metadata(article), ensure_ascii=False, indent=1))
+            count += 1
+    return count
+
+def export_zip(article_ids, store=None):
+    """ZIP 바이트 (st.download_button 지연 생성용)
+    st.download_button은 받은 데이터를 전부 메모리에 올려 두므로 압축된 ZIP 전체 크기만큼은 메모리를 씀
+    (파일 객체를 넘겨도 같음). 작성 중 추가 메모리는 원고 1건 + 최대 EXPORT_SPOOL_SIZE (넘으면 임시 파일).
+    메모리에 ZIP 전체를 두지 않고 파일로 받으려면 write_articles_zip 사용"""
+    with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE) as spool:
+        write_articles_zip(spool, list(article_ids), store)
+        spool.seek(0)
+        return spool.read()
@@ -0,0 +1,108 @@
+"""GHOST HUB 백그라운드 작업 큐 - 생성 파이프라인을 프로세스 공용 작업자에서 실행하고 소유자(세션)별로 상태 조회"""
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_WORKERS = int(os.getenv("GHOST_JOB_WORKERS") or 4)          # 동시에 실행할 생성 작업 수 (프로세스 전체)
+JOB_RETENTION = int(os.getenv("GHOST_JOB_RETENTION") or 3600)   # 끝난 작업 보관 시간 (초)
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = '대기', '진행 중', '완료', '실패', '취소'
+
+class Job:
+    """생성 작업 1건 - 상태/결과/스트리밍 본문은 작업 스레드가 갱신하고 UI는 읽기만 함"""
+    def __init__(self, owner, mode, label, func):
+        self.id = uuid.uuid4().hex[:12]
+        self.owner = owner
+        self.mode = mode
+        self.label = label
+        self.func = func
+        self.status = PENDING
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = ""
+        self.preview = ""   # 스트리밍 중 본문
+        self.future = None
+
+    def report(self, extractor):
+        """on_progress 콜백 - 스트리밍 중 본문 기록"""
+        self.preview = extractor.content
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def elapsed(self):
+        """실행 시간 (초, 시작 전이면 0)"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+class JobQueue:
+    """프로세스 공용 작업 큐 (스레드 작업자 + 작업 목록, 스레드 안전)
+    세션이 끊기거나 새로고침해도 작업은 계속 실행되고, 같은 소유자 id로 결과를 다시 찾을 수 있음"""
+    def __init__(self, workers=JOB_WORKERS, retention=JOB_RETENTION):
+        self.retention = retention
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ghost-job")
+        self._lock = threading.Lock()
+        self._jobs = {}   # id → Job (등록 순서 유지)
+
+    def submit(self, owner, mode, label, func):
+        """작업 등록 - func(job)을 작업자에서 실행하고 반환값을 job.result에 보관"""
+        job = Job(owner, mode, label, func)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        job.future = self._pool.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        job.started_at = time.time()
+        job.status = RUNNING
+        try:
+            job.result = job.func(job)
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            job.preview = ""
+
+    def cancel(self, job_id):
+        """대기 중인 작업 취소 (이미 실행 중이면 False)"""
+        job = self.get(job_id)
+        if job is None or not job.future.cancel():
+            return False
+        job.status = CANCELLED
+        job.finished_at = time.time()
+        return True
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, owner):
+        """소유자의 작업 목록 (등록 순)"""
+        with self._lock:
+            return [job for job in self._jobs.values() if job.owner == owner]
+
+    def _prune(self):
+        # 보관 시간이 지난 완료 작업 정리 (잠금 안에서 호출)
+        cutoff = time.time() - self.retention
+        for job_id in [job.id for job in self._jobs.values() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_queue():
+    """프로세스 공용 작업 큐 (최초 사용 시 생성)"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
@@ -0,0 +1,134 @@
+"""GHOST HUB 성능 계측 - 생성 단계별 소요 시간을 모드/페르소나/구조별로 모아 백분위 집계 및 내보내기"""
+import os
+import json
+import math
+import time
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+METRICS_MAX_SAMPLES = int(os.getenv("GHOST_METRICS_SAMPLES") or 1000)   # 라벨 조합별 보관 표본 수
+METRICS_LOG = os.getenv("GHOST_METRICS_LOG")                            # 지정 시 측정값을 JSONL로 계속 기록
+
+LABELS = ('mode', 'persona', 'structure')
+QUANTILES = (0.5, 0.95, 0.99)
+
+# 현재 생성 작업의 라벨 (스레드/태스크로 전파되도록 contextvar 사용)
+_labels = contextvars.ContextVar('ghost_metric_labels', default={})
+
+@contextmanager
+def metric_labels(**labels):
+    """with 블록 안에서 기록되는 측정값에 라벨 부여 (mode/persona/structure)"""
+    token = _labels.set({**_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+def percentile(sorted_values, q):
+    """nearest-rank 백분위 (정렬된 목록)"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class LatencyMetrics:
+    """단계별 소요 시간 저장소 (프로세스 공용, 스레드 안전)
+    라벨 조합별 최근 표본은 max_samples개까지, 누적 건수/합계는 전체 보관"""
+    def __init__(self, max_samples=METRICS_MAX_SAMPLES, log_path=METRICS_LOG):
+        self.max_samples = max_samples
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._samples = {}   # (단계, mode, persona, structure) → deque[초]
+        self._totals = {}    # 같은 키 → [건수, 합계]
+        self._events = deque(maxlen=max_samples * 10)
+
+    def observe(self, stage, seconds, **labels):
+        """측정값 1건 기록 (라벨은 현재 metric_labels에 덮어씀)"""
+        merged = {**_labels.get(), **labels}
+        event = {'ts': round(time.time(), 3), 'stage': stage, 'seconds': round(seconds, 4)}
+        event.update((name, merged.get(name) or '') for name in LABELS)
+        key = (stage,) + tuple(event[name] for name in LABELS)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.max_samples)
+                self._totals[key] = [0, 0.0]
+            samples.append(seconds)
+            totals = self._totals[key]
+            totals[0] += 1
+            totals[1] += seconds
+            self._events.append(event)
+        if self.log_path:
+            # 파일 기록은 잠금 밖에서 (디스크 I/O가 다른 세션의 측정 기록을 막지 않도록, 한 줄씩 append)
+            line = json.dumps(event, ensure_ascii=False) + "\n"
+            try:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+            except OSError:
+                pass
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        """with 블록 소요 시간 기록 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, **labels)
+
+    def label_values(self, name):
+        """기록된 라벨 값 목록 (빈 값 제외)"""
+        index = 1 + LABELS.index(name)
+        with self._lock:
+            return sorted({key[index] for key in self._samples if key[index]})
+
+    def summary(self, mode=None, persona=None, structure=None):
+        """필터에 맞는 표본을 단계별로 합쳐 [{'stage', 'count', 'p50', 'p95', 'p99'}] 반환 (초)"""
+        wanted = dict(zip(LABELS, (mode, persona, structure)))
+        merged = {}
+        with self._lock:
+            for key, samples in self._samples.items():
+                if all(value is None or key[1 + i] == value for i, value in enumerate(wanted.values())):
+                    merged.setdefault(key[0], []).extend(samples)
+        rows = []
+        for stage, values in merged.items():
+            values.sort()
+            row = {'stage': stage, 'count': len(values)}
+            for q in QUANTILES:
+                row[f"p{round(q * 100)}"] = percentile(values, q)
+            rows.append(row)
+        return sorted(rows, key=lambda row: row['stage'])
+
+    def to_jsonl(self):
+        """최근 측정값을 JSON Lines 문자열로"""
+        with self._lock:
+            events = list(self._events)
+        return "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 형식 (summary: 분위수 + _sum/_count)"""
+        lines = [
+            "# HELP ghost_stage_latency_seconds GHOST HUB 생성 단계별 소요 시간",
+            "# TYPE ghost_stage_latency_seconds summary",
+        ]
+        with self._lock:
+            items = [(key, sorted(samples), list(self._totals[key])) for key, samples in self._samples.items()]
+        for key, values, (count, total) in sorted(items):
+            labels = ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(('stage',) + LABELS, key))
+            for q in QUANTILES:
+                lines.append(f'ghost_stage_latency_seconds{{{labels},quantile="{q}"}} {percentile(values, q):.6f}')
+            lines.append(f"ghost_stage_latency_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"ghost_stage_latency_seconds_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self._events.clear()
+
+metrics = LatencyMetrics()
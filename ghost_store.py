@@ -0,0 +1,114 @@
+"""GHOST HUB 원고 저장소 - 생성된 원고를 SQLite에 보관하고 키워드/모드로 재사용"""
+import os
+import json
+import time
+import sqlite3
+import threading
+
+DB_PATH = os.getenv("GHOST_DB_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "ghost_hub.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    mode TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    keyword_norm TEXT NOT NULL,
+    product TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    persona TEXT NOT NULL DEFAULT '',
+    structure TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    raw_json TEXT NOT NULL DEFAULT '',
+    html TEXT NOT NULL,
+    timings TEXT NOT NULL DEFAULT '{}',
+    assembly TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_articles_keyword ON articles (keyword_norm, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_articles_mode ON articles (mode, created_at DESC);
+"""
+
+# 이전 버전 DB에 없는 열 추가 (열 이름, 정의)
+MIGRATIONS = [
+    ('assembly', "TEXT NOT NULL DEFAULT '{}'"),
+]
+
+# 목록 조회 시에는 무거운 html/raw_json 제외
+SUMMARY_COLUMNS = "id, created_at, mode, keyword, product, url, persona, structure, title, timings"
+
+def normalize_keyword(keyword):
+    """검색용 키워드 정규화 (공백/대소문자)"""
+    return " ".join(keyword.split()).lower()
+
+class ArticleStore:
+    """원고 저장소 (스레드 공용 연결 + 잠금)"""
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(articles)")}
+            for column, definition in MIGRATIONS:
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE articles ADD COLUMN {column} {definition}")
+
+    def save(self, mode, keyword, html, product='', url='', persona='', structure='', title='',
+             raw_json=None, timings=None, assembly=None):
+        """원고 1건 저장 후 id 반환 (assembly: 스타일 다시 뽑기용 조립 인자)"""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO articles (created_at, mode, keyword, keyword_norm, product, url, persona, structure,"
+                " title, raw_json, html, timings, assembly) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), mode, keyword, normalize_keyword(keyword), product or '', url or '',
+                 persona or '', structure or '', title or '',
+                 json.dumps(raw_json, ensure_ascii=False) if raw_json is not None else '',
+                 html, json.dumps(timings or {}), json.dumps(assembly or {}, ensure_ascii=False)))
+            return cur.lastrowid
+
+    def find(self, keyword=None, mode=None, limit=20):
+        """키워드/모드로 최근 원고 목록 조회 (html 제외)"""
+        where, params = [], []
+        if keyword:
+            where.append("keyword_norm = ?")
+            params.append(normalize_keyword(keyword))
+        if mode:
+            where.append("mode = ?")
+            params.append(mode)
+        sql = f"SELECT {SUMMARY_COLUMNS} FROM articles"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def get(self, article_id):
+        """원고 1건 전체 조회 (없으면 None)"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM articles WHERE id = ?", (article_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    @staticmethod
+    def _to_dict(row):
+        item = dict(row)
+        item['timings'] = json.loads(item.get('timings') or '{}')
+        if 'assembly' in item:
+            item['assembly'] = json.loads(item['assembly'] or '{}')
+        if item.get('raw_json'):
+            item['raw_json'] = json.loads(item['raw_json'])
+        return item
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """프로세스 공용 저장소 (최초 사용 시 생성)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArticleStore()
+        return _store
@@ -0,0 +1,106 @@
+"""ghost_admission 입장 제어 테스트 - 세션별 공정 대기열, 자리 반납, 속도 제한"""
+import time
+import asyncio
+import threading
+
+import pytest
+
+from ghost_admission import AdmissionController, admission_owner
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("조건이 시간 안에 충족되지 않음")
+        time.sleep(0.005)
+
+def test_owners_take_turns():
+    """한 세션이 몰아 넣어도 다른 세션 요청이 그 뒤로 밀리지 않음"""
+    controller = AdmissionController(concurrency=1)
+    controller.acquire('holder')
+    order = []
+
+    def call(owner, label):
+        controller.acquire(owner)
+        order.append(label)
+        controller.release()
+
+    threads = []
+    for owner, label in [('a', 'a1'), ('a', 'a2'), ('a', 'a3'), ('b', 'b1')]:
+        thread = threading.Thread(target=call, args=(owner, label))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: controller.status()['waiting'] == len(threads))
+    assert controller.status('a')['queued'] == 3
+    assert controller.status('b')['position'] == 2
+    controller.release()
+    for thread in threads:
+        thread.join(2)
+    assert order == ['a1', 'b1', 'a2', 'a3']
+    assert controller.status() == {'position': None, 'queued': 0, 'waiting': 0, 'active': 0, 'eta': None}
+
+def test_concurrency_limit_and_release():
+    controller = AdmissionController(concurrency=2)
+    controller.acquire('a')
+    controller.acquire('b')
+    assert not controller.try_acquire()
+    controller.release(0.5)
+    assert controller.try_acquire()
+    assert controller.status()['active'] == 2
+
+def test_try_acquire_yields_to_waiting_callers():
+    controller = AdmissionController(concurrency=1)
+    controller.acquire('holder')
+    waiter = threading.Thread(target=controller.acquire, args=('a',))
+    waiter.start()
+    wait_until(lambda: controller.status()['waiting'] == 1)
+    controller.release()
+    waiter.join(2)
+    assert controller.status()['active'] == 1
+    controller.release()
+    assert controller.try_acquire()
+
+def admission_owner_acquire(controller, owner):
+    with admission_owner(owner):
+        controller.acquire()
+
+def test_owner_context_is_used_by_default():
+    controller = AdmissionController(concurrency=1)
+    controller.acquire('holder')
+    waiter = threading.Thread(target=lambda: admission_owner_acquire(controller, 'session-1'))
+    waiter.start()
+    wait_until(lambda: controller.status('session-1')['queued'] == 1)
+    controller.release()
+    waiter.join(2)
+    assert controller.status('session-1')['queued'] == 0
+
+def test_cancelled_async_waiter_leaves_the_line():
+    controller = AdmissionController(concurrency=1)
+    controller.acquire('holder')
+
+    async def scenario():
+        task = asyncio.ensure_future(controller.acquire_async('a'))
+        await asyncio.sleep(0.1)
+        assert controller.status('a')['queued'] == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert controller.status()['waiting'] == 0
+        controller.release()
+        assert await controller.acquire_async('b') >= 0
+
+    asyncio.run(scenario())
+    assert controller.status()['active'] == 1
+
+def test_rate_limit_spaces_out_calls():
+    controller = AdmissionController(rpm=600, burst=1, concurrency=10)   # 0.1초에 1건
+    assert controller.acquire('a') < 0.01
+    controller.release()
+    assert controller.acquire('a') >= 0.05
+    controller.release()
+
+def test_pause_blocks_new_calls():
+    controller = AdmissionController(concurrency=10)
+    controller.pause(0.1)
+    assert not controller.try_acquire()
+    assert controller.acquire('a') >= 0.05
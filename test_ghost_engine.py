@@ -0,0 +1,368 @@
+"""ghost_engine 순수 함수 테스트 (네트워크/모델 호출 없음)"""
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import ghost_engine
+from ghost_engine import (BATCH_MAX_RETRIES, CONTENT_RULES, GEMINI_MAX_OUTPUT_TOKENS, GeminiRequestError,
+                          LLMJSONError, LLMTruncatedError, ModeModelCache, RETRYABLE_ERRORS, PhraseMatcher, TokenBudget, compress_facts, estimate_tokens,
+                          extract_json_object, generate_text, minhash_signature, minhash_similarity,
+                          mode_max_tokens, mode_target_chars, parse_llm_json, process_batch_item, repair_json,
+                          run_batch_async, shingles)
+
+# ==========================================
+# 검색 결과 압축 (MinHash 중복 제거 + 토큰 예산)
+# ==========================================
+
+ARTICLE = "정부가 겨울철 전기요금 누진제 완화 방안을 발표했다. 가구당 월 평균 부담이 줄어들 전망이다."
+
+def test_minhash_similarity_ignores_spacing_and_punctuation():
+    same = minhash_signature(shingles(ARTICLE))
+    respaced = minhash_signature(shingles(ARTICLE.replace(" ", "  ").replace(".", "!")))
+    other = minhash_signature(shingles("신형 무선청소기 흡입력 비교 리뷰와 배터리 사용 시간 측정 결과"))
+    assert minhash_similarity(same, respaced) == 1.0
+    assert minhash_similarity(same, other) < 0.2
+    assert minhash_signature(shingles(" .,! ")) is None
+
+def test_compress_facts_drops_near_duplicates():
+    results = [
+        {'title': "전기요금 완화", 'body': ARTICLE},
+        {'title': "전기요금 완화", 'body': ARTICLE.replace("발표했다", "발표했습니다")},   # 재전송 기사
+        {'title': "전기요금 절약 팁", 'body': "겨울철 전기요금을 아끼려면 보일러 설정 온도를 낮추세요."},
+    ]
+    facts = compress_facts(results, "겨울철 전기요금")
+    assert facts.count("정보원: 전기요금 완화") == 1
+    assert "정보원: 전기요금 절약 팁" in facts
+
+def test_compress_facts_prefers_relevant_articles():
+    results = [
+        {'title': "무관한 연예 소식", 'body': "배우가 새 드라마 촬영을 시작했다."},
+        {'title': "전기요금 소식", 'body': ARTICLE},
+    ]
+    facts = compress_facts(results, "전기요금")
+    assert facts.startswith("정보원: 전기요금 소식")
+    assert "연예" not in facts
+
+def test_compress_facts_truncates_long_article_to_remaining_budget():
+    long_body = "전기요금 " + "누진 구간별 요금 변화와 가구별 영향 분석 " * 100
+    results = [
+        {'title': "전기요금 요약", 'body': "전기요금 완화 발표."},
+        {'title': "전기요금 상세", 'body': long_body},
+    ]
+    facts = compress_facts(results, "전기요금", budget=200)
+    assert "정보원: 전기요금 요약" in facts
+    assert "정보원: 전기요금 상세" in facts   # 예산보다 길어도 빠지지 않고 잘려서 들어감
+    assert facts.rstrip().endswith("…")
+    assert estimate_tokens(facts) <= 200
+
+def test_compress_facts_truncates_first_article_even_if_budget_is_tiny():
+    facts = compress_facts([{'title': "전기요금", 'body': ARTICLE * 50}], "전기요금", budget=30)
+    assert facts.startswith("정보원: 전기요금")
+    assert estimate_tokens(facts) <= 30
+
+# ==========================================
+# 다중 문구 검색기 (Aho-Corasick)
+# ==========================================
+
+def test_phrase_matcher_finds_overlapping_and_nested_phrases():
+    matcher = PhraseMatcher({'he': 'a', 'she': 'b', 'his': 'c', 'hers': 'd'})
+    matches, visible = matcher.scan("ushers")
+    assert sorted(matches) == [(1, 4, 'she', 'b'), (2, 4, 'he', 'a'), (2, 6, 'hers', 'd')]
+    assert visible == 6
+
+def test_phrase_matcher_matches_repeated_and_suffix_phrases():
+    matcher = PhraseMatcher({'쿠팡': 'coupang', '팡팡': 'x', '팡': 'y'})
+    matches, _ = matcher.scan("쿠팡팡팡")
+    assert sorted(matches) == [(0, 2, '쿠팡', 'coupang'), (1, 2, '팡', 'y'), (1, 3, '팡팡', 'x'),
+                               (2, 3, '팡', 'y'), (2, 4, '팡팡', 'x'), (3, 4, '팡', 'y')]
+
+def test_phrase_matcher_skips_tags_but_not_markers():
+    matcher = PhraseMatcher({'Q1': 'faq', '[H3]': 'marker', 'span': 'x'})
+    text = '<span style="color:red">Q1</span> [H3]제목[/H3] 3 < 5'
+    matches, visible = matcher.scan(text)
+    assert [(text[s:e], kind) for s, e, _, kind in matches] == [('Q1', 'faq'), ('[H3]', 'marker')]
+    assert visible == len('Q1 [H3]제목[/H3] 3 < 5')
+
+# ==========================================
+# LLM JSON 추출 / 복구
+# ==========================================
+
+def test_extract_json_object_skips_prose_and_code_fence():
+    text = '네, 작성했습니다.\n```json\n{"title": "제목", "content": "본문"}\n```\n도움이 되셨나요? {끝}'
+    assert extract_json_object(text) == ('{"title": "제목", "content": "본문"}', True)
+
+def test_extract_json_object_ignores_braces_inside_strings():
+    text = '{"content": "괄호 } 와 {중첩} 그리고 \\"따옴표\\""} 뒤'
+    candidate, closed = extract_json_object(text)
+    assert closed
+    assert json.loads(candidate)['content'] == '괄호 } 와 {중첩} 그리고 "따옴표"'
+
+def test_extract_json_object_unclosed_and_missing():
+    assert extract_json_object('{"content": "끊긴') == ('{"content": "끊긴', False)
+    assert extract_json_object('JSON 없음') == (None, False)
+
+def test_repair_json_escapes_inner_quotes_and_raw_newlines():
+    repaired, truncated = repair_json('{"content": "그가 "좋다"고 했다\n다음 줄\t탭", "title": "제목"}')
+    assert not truncated
+    assert json.loads(repaired) == {'content': '그가 "좋다"고 했다\n다음 줄\t탭', 'title': '제목'}
+
+def test_repair_json_removes_trailing_commas():
+    repaired, truncated = repair_json('{"content": "본문", "tags": ["a", "b",],}')
+    assert not truncated
+    assert json.loads(repaired) == {'content': '본문', 'tags': ['a', 'b']}
+
+@pytest.mark.parametrize('candidate', [
+    '{"title": "제목", "content": "배터리도 오래 가고 흡입',   # 문자열 중간
+    '{"title": "제목", "content": "본문", "hashtags": ["#a", ',  # 배열 중간
+    '{"title": "제목", "content": "본문"',                        # 닫는 괄호 없음
+    '{"content": "끝이 역슬래시\\',                              # 이스케이프 중간
+])
+def test_repair_json_flags_truncation(candidate):
+    repaired, truncated = repair_json(candidate)
+    assert truncated
+    json.loads(repaired)   # 닫아 준 결과는 여전히 유효한 JSON
+
+def test_parse_llm_json_with_trailing_prose_and_inner_quotes():
+    raw = '```json\n{"title": "제목", "content": "5" 화면이 "선명"해요", "hashtags": "#a"}\n```\n이상입니다.'
+    assert parse_llm_json(raw) == {'title': '제목', 'content': '5" 화면이 "선명"해요', 'hashtags': '#a'}
+
+def test_parse_llm_json_raises_on_truncated_response():
+    with pytest.raises(LLMTruncatedError):
+        parse_llm_json('{"title": "제목", "content": "[H3]1. 장점[/H3]\\n배터리도 오래 가고 흡입')
+    assert issubclass(LLMTruncatedError, LLMJSONError)
+    assert issubclass(LLMTruncatedError, RETRYABLE_ERRORS)
+
+def test_parse_llm_json_without_content():
+    with pytest.raises(LLMJSONError):
+        parse_llm_json('{"title": "제목만"}')
+    with pytest.raises(LLMJSONError):
+        parse_llm_json('JSON이 아닌 응답')
+
+# ==========================================
+# 원고 검수 / 자동 교정
+# ==========================================
+
+NAVER_PROFIT = CONTENT_RULES['naver_profit']
+FAQ_AND_CTAS = "\n[[CTA_1]]\nQ1 질문\nQ2 질문\nQ3 질문\n[[CTA_2]]"
+
+def issue_kinds(report, fix='any'):
+    return sorted(issue['kind'] for issue in report['issues'] if fix == 'any' or issue.get('fix') == fix)
+
+@pytest.mark.parametrize('sentence', [
+    "솔직히 저는 처음에 반신반의했어요.",   # 1인칭 경험담 (프롬프트가 요구하는 스토리텔링)
+    "마무리감이 좋아요.",                   # 제품 마감 품질
+    "결론부터 말하면 대박.",
+])
+def test_bare_banned_words_are_reported_not_deleted(sentence):
+    content = f"[H3]1. 사용 후기[/H3]\n흡입력이 좋아요. {sentence} 배터리도 오래가요.{FAQ_AND_CTAS}"
+    fixed_content, fixed, report = NAVER_PROFIT.fix(content)
+    assert sentence in fixed_content
+    assert not set(fixed) & {'greeting', 'intro', 'closing'}
+    assert 'sentence' not in [issue.get('fix') for issue in report['issues']]
+    instructions = [text for texts, _ in NAVER_PROFIT.plan_repairs(fixed_content, report).values() for text in texts]
+    assert not any("표현 없이" in text or "소제목 대신" in text for text in instructions)   # 다시 쓰기 대상도 아님
+
+def test_bare_banned_word_is_listed_for_review():
+    report = NAVER_PROFIT.check("[H3]1. 사용 후기[/H3]\n마무리감이 좋아요." + FAQ_AND_CTAS)
+    closing = [issue for issue in report['issues'] if issue['kind'] == 'closing']
+    assert [issue['fix'] for issue in closing] == [None]
+    assert "확인 필요" in closing[0]['message']
+
+def test_self_intro_sentence_is_deleted():
+    content = "[H3]1. 사용 후기[/H3]\n흡입력이 좋아요. 저는 10년차 살림 블로거입니다. 배터리도 오래가요." + FAQ_AND_CTAS
+    fixed_content, fixed, report = NAVER_PROFIT.fix(content)
+    assert "블로거" not in fixed_content
+    assert "흡입력이 좋아요. 배터리도 오래가요." in fixed_content
+    assert 'intro' in fixed
+    assert issue_kinds(report, 'sentence') == []
+
+def test_greeting_is_deleted_only_at_the_start():
+    content = ("안녕하세요! 오늘은 무선청소기를 알아보겠습니다. 요즘 청소 고민 많으시죠?\n"
+               "[H3]1. 사용 후기[/H3]\n이웃이 안녕하세요 하고 물어보더라고요." + FAQ_AND_CTAS)
+    fixed_content, fixed, report = NAVER_PROFIT.fix(content)
+    assert fixed_content.startswith("요즘 청소 고민 많으시죠?")
+    assert "이웃이 안녕하세요 하고 물어보더라고요." in fixed_content
+    assert fixed == ['greeting']
+    greeting = [issue for issue in report['issues'] if issue['kind'] == 'greeting']
+    assert [issue['fix'] for issue in greeting] == [None]   # 본문 중간 인사말은 알리기만
+
+def test_closing_heading_goes_to_section_rewrite():
+    content = ("[H3]1. 사용 후기[/H3]\n흡입력이 좋아요.\n[H3]2. 마무리감 비교[/H3]\n마감이 깔끔해요.\n"
+               "[H3]3. 마무리[/H3]\n지금까지 정리해 봤어요." + FAQ_AND_CTAS)
+    fixed_content, fixed, report = NAVER_PROFIT.fix(content)
+    assert "[H3]3. 마무리[/H3]" in fixed_content   # 로컬로는 지우지 않음
+    closing = [issue for issue in report['issues'] if issue.get('fix') == 'section']
+    assert [issue['phrase'] for issue in closing] == ["3. 마무리"]
+    repairs = NAVER_PROFIT.plan_repairs(fixed_content, report)
+    assert list(repairs) == [3]
+
+def test_fix_markdown_dates_and_ctas():
+    content = ("## 첫 소제목\n**핵심** 정리 (2024년 10월 17일 기준)\n[[CTA_1]]\n[[CTA_1]]\n"
+               "[H3]2. 둘째[/H3]\n내용\n[H3]3. 셋째[/H3]\n내용\n[H3]4. FAQ[/H3]\nQ1 질문\nQ2 질문\nQ3 질문")
+    fixed_content, fixed, report = NAVER_PROFIT.fix(content)
+    assert "[H3]첫 소제목[/H3]" in fixed_content and "<b>핵심</b>" in fixed_content
+    assert "2024" not in fixed_content
+    assert fixed_content.count("[[CTA_1]]") == 1
+    assert fixed_content.index("[[CTA_2]]") < fixed_content.index("Q1")
+    assert set(fixed) == {'markdown', 'date', 'cta'}
+    assert 'cta' not in issue_kinds(report)
+
+def test_date_fix_only_touches_the_removed_span():
+    content = "가격  비교표 (2024년 10월 17일 기준) 참고\n2024년 10월 출시된  신형\n"
+    fixed_content, fixed, _ = NAVER_PROFIT.fix(content)
+    assert 'date' in fixed
+    assert fixed_content.startswith("가격  비교표 참고\n최근 출시된  신형")
+
+# ==========================================
+# 출력 토큰 예산 (MAX_TOKENS 잘림)
+# ==========================================
+
+class FakeResponse:
+    """generate_content 응답 흉내 - text가 None이면 사고 토큰만 쓰고 끊긴 응답처럼 ValueError"""
+    def __init__(self, text, finish_reason='STOP', tokens=100):
+        self._text = text
+        self.candidates = [SimpleNamespace(finish_reason=SimpleNamespace(name=finish_reason))]
+        self.usage_metadata = SimpleNamespace(prompt_token_count=10, total_token_count=10 + tokens)
+
+    @property
+    def text(self):
+        if self._text is None:
+            raise ValueError("응답에 텍스트 part가 없습니다.")
+        return self._text
+
+class FakeModel:
+    def __init__(self, response):
+        self.response = response
+        self.configs = []
+
+    def generate_content(self, prompt, generation_config=None, request_options=None):
+        self.configs.append(generation_config)
+        return self.response
+
+@pytest.fixture
+def budget(monkeypatch):
+    budget = TokenBudget(initial=2.0)
+    monkeypatch.setattr(ghost_engine, 'token_budget', budget)
+    return budget
+
+def use_model(monkeypatch, response):
+    model = FakeModel(response)
+    monkeypatch.setattr(ghost_engine, 'get_model', lambda mode=None: model)
+    return model
+
+def test_open_ended_length_rule_is_not_capped(budget):
+    assert mode_target_chars('tistory_profit') is None   # 2500자 이상
+    assert mode_max_tokens('tistory_profit') == GEMINI_MAX_OUTPUT_TOKENS
+    assert mode_target_chars('naver_profit') == round(2400 * 1.1)
+    assert mode_max_tokens('naver_profit') < GEMINI_MAX_OUTPUT_TOKENS
+    assert mode_max_tokens('tistory_profit', 500) < GEMINI_MAX_OUTPUT_TOKENS   # 섹션 다시 쓰기
+
+def test_complete_response_is_returned(monkeypatch, budget):
+    use_model(monkeypatch, FakeResponse('{"content": "본문"}', tokens=40))
+    assert generate_text("prompt", mode='naver_profit') == '{"content": "본문"}'
+    assert budget.snapshot()['naver_profit'][1] == 1
+
+def test_max_tokens_response_raises_retryable_error_after_boosting(monkeypatch, budget):
+    model = use_model(monkeypatch, FakeResponse('{"content": "잘린 본' + '문' * 99, 'MAX_TOKENS', tokens=400))
+    before = mode_max_tokens('naver_profit')
+    with pytest.raises(LLMTruncatedError) as error:
+        generate_text("prompt", mode='naver_profit')
+    assert isinstance(error.value, RETRYABLE_ERRORS)
+    assert model.configs[0]['max_output_tokens'] == before
+    assert mode_max_tokens('naver_profit') > before   # 재시도는 늘어난 한도로
+
+def test_thinking_only_truncation_raises_retryable_error(monkeypatch, budget):
+    use_model(monkeypatch, FakeResponse(None, 'MAX_TOKENS', tokens=4000))
+    before = budget.ratio('naver_info')
+    with pytest.raises(LLMTruncatedError):
+        generate_text("prompt", mode='naver_info')
+    assert budget.ratio('naver_info') > before
+
+def test_textless_response_that_was_not_truncated_still_raises_value_error(monkeypatch, budget):
+    use_model(monkeypatch, FakeResponse(None, 'SAFETY'))
+    with pytest.raises(ValueError) as error:
+        generate_text("prompt", mode='naver_info')
+    assert not isinstance(error.value, LLMTruncatedError)
+
+# ==========================================
+# 모드별 모델 캐시
+# ==========================================
+
+class SlowModelCache(ModeModelCache):
+    """'slow' 모드의 생성(캐시 등록)이 release될 때까지 멈추는 캐시"""
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.builds = []
+
+    def _build(self, mode, use_cache):
+        self.builds.append(mode)
+        if mode == 'slow':
+            self.started.set()
+            assert self.release.wait(5)
+        return f"model-{mode}", None
+
+def test_slow_model_build_blocks_only_the_same_mode():
+    cache = SlowModelCache()
+    with ThreadPoolExecutor(3) as pool:
+        waiting = [pool.submit(cache.get, 'slow') for _ in range(2)]
+        assert cache.started.wait(5)
+        assert cache.get('fast') == "model-fast"   # 다른 모드는 기다리지 않음
+        assert not any(future.done() for future in waiting)
+        cache.release.set()
+        assert [future.result(5) for future in waiting] == ["model-slow"] * 2
+    assert sorted(cache.builds) == ['fast', 'slow']   # 같은 모드는 1번만 생성
+    assert cache.get('slow') == "model-slow" and len(cache.builds) == 2
+
+# ==========================================
+# 배치 행 재시도
+# ==========================================
+
+def run_failing_row(monkeypatch, errors):
+    """errors를 차례로 던지고 다 쓰면 성공하는 run_batch_row로 한 행 처리 → 항목"""
+    errors = list(errors)
+
+    def run_batch_row(row):
+        if errors:
+            raise errors.pop(0)
+        return {'title': "완료"}
+
+    monkeypatch.setattr(ghost_engine, 'run_batch_row', run_batch_row)
+    monkeypatch.setattr(ghost_engine, 'backoff_delay', lambda attempt: 0)
+    item = {'row': {}, 'status': '대기', 'attempts': 0, 'error': "", 'result': None}
+    process_batch_item(item)
+    return item
+
+def test_batch_row_retries_unparseable_output(monkeypatch):
+    item = run_failing_row(monkeypatch, [LLMJSONError("JSON 형식을 찾을 수 없습니다.")])
+    assert (item['status'], item['attempts']) == ('완료', 2)
+    item = run_failing_row(monkeypatch, [LLMJSONError("형식 오류")] * (BATCH_MAX_RETRIES + 1))
+    assert (item['status'], item['attempts']) == ('실패', BATCH_MAX_RETRIES + 1)
+
+@pytest.mark.parametrize('error', [
+    GeminiRequestError("Gemini 요청이 3회 모두 실패했습니다"),   # 요청 계층이 이미 재시도함
+    TimeoutError("마감 초과"),
+    ValueError("알 수 없는 모드"),
+])
+def test_batch_row_does_not_retry_errors_the_request_layer_handled(monkeypatch, error):
+    item = run_failing_row(monkeypatch, [error])
+    assert (item['status'], item['attempts']) == ('실패', 1)
+
+def test_async_batch_uses_the_same_retry_rule(monkeypatch):
+    errors = {'a': [LLMJSONError("형식 오류")], 'b': [GeminiRequestError("3회 모두 실패")]}
+
+    async def run_batch_row_async(row):
+        if errors[row['keyword']]:
+            raise errors[row['keyword']].pop(0)
+        return {'title': "완료"}
+
+    monkeypatch.setattr(ghost_engine, 'run_batch_row_async', run_batch_row_async)
+    monkeypatch.setattr(ghost_engine, 'backoff_delay', lambda attempt: 0)
+    items = [{'row': {'keyword': k}, 'status': '대기', 'attempts': 0, 'error': "", 'result': None} for k in 'ab']
+    asyncio.run(run_batch_async(items))
+    assert [(it['status'], it['attempts']) for it in items] == [('완료', 2), ('실패', 1)]